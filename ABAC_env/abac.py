@@ -1,3 +1,9 @@
+from functools import lru_cache
+
+import numpy as np
+
+DECISION_CACHE_SIZE = 4096
+
 resources = {
     'admin_page':       {'required_role': 'Admin',      'required_clearance': 5},
     'engineering_page': {'required_department': 'Engineering', 'required_clearance': 3},
@@ -6,7 +12,9 @@ resources = {
 
 def check_access(user_attrs, resource):
     """Return True if user_attrs satisfy the policy for resource, else False."""
-    policy = resources.get(resource, {})
+    if resources is not _watched_resources:
+        policy_changed()
+    policy = _policies.get(resource, {})
     role_req = policy.get('required_role')
     if role_req and user_attrs.get('role') != role_req:
         return False
@@ -17,3 +25,166 @@ def check_access(user_attrs, resource):
     if clearance_req and user_attrs.get('clearance', 0) < clearance_req:
         return False
     return True
+
+
+def _decide(role, department, clearance, resource):
+    """check_access for a user with the given attributes."""
+    return check_access({'role': role, 'department': department, 'clearance': clearance}, resource)
+
+
+_cached_decide = lru_cache(maxsize=DECISION_CACHE_SIZE)(_decide)
+
+
+class PolicyTable(dict):
+    """A dict that calls policy_changed() after every edit; dict values are PolicyTables too.
+
+    `resources` is one, so both resources['x'] = {...} and resources['x']['required_clearance'] = 3
+    are seen by check_access and drop the cached decisions.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        for key, value in dict(*args, **kwargs).items():
+            dict.__setitem__(self, key, _watched(value))
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, _watched(value))
+        policy_changed()
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        policy_changed()
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            dict.__setitem__(self, key, _watched(value))
+        policy_changed()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, *args):
+        value = dict.pop(self, *args)
+        policy_changed()
+        return value
+
+    def popitem(self):
+        item = dict.popitem(self)
+        policy_changed()
+        return item
+
+    def clear(self):
+        dict.clear(self)
+        policy_changed()
+
+
+def _watched(value):
+    return PolicyTable(value) if isinstance(value, dict) and not isinstance(value, PolicyTable) else value
+
+
+def policy_changed():
+    """Pick up the current `resources` and drop cached decisions. Edits through `resources` call this themselves.
+
+    check_access reads a plain-dict copy of the policies, which reads faster than a PolicyTable.
+    A `resources` rebound to a new dict is made a PolicyTable here.
+    """
+    global resources, _watched_resources, _policies
+    resources = _watched(resources)
+    _watched_resources = resources
+    _policies = {name: dict(policy) for name, policy in resources.items()}
+    _cached_decide.cache_clear()
+
+
+_watched_resources = None
+policy_changed()
+
+
+def check_access_cached(user_attrs, resource):
+    """check_access through a bounded LRU cache keyed on the user's (role, department, clearance) and the resource.
+
+    The key does not hold the policy, which would cost more to build than the check it
+    saves; instead every edit to `resources` or one of its policies clears the cache.
+    """
+    if resources is not _watched_resources:
+        policy_changed()
+    return _cached_decide(user_attrs.get('role'), user_attrs.get('department'), user_attrs.get('clearance', 0),
+                          resource)
+
+
+def decision_cache_info():
+    """Hits, misses, maxsize and current size of the decision cache."""
+    return _cached_decide.cache_info()
+
+
+def set_decision_cache_size(maxsize):
+    """Replace the decision cache with an empty one holding at most `maxsize` decisions."""
+    global _cached_decide
+    _cached_decide = lru_cache(maxsize=maxsize)(_decide)
+
+
+def users_to_columns(users):
+    """Columnar user table {'role', 'department', 'clearance'} from a list of user attribute dicts."""
+    return {
+        'role': np.array([u.get('role') or '' for u in users], dtype=str),
+        'department': np.array([u.get('department') or '' for u in users], dtype=str),
+        'clearance': np.array([u.get('clearance', 0) for u in users]),
+    }
+
+
+class CompiledPolicy:
+    """The resources table compiled into per-resource requirement arrays.
+
+    evaluate() returns the users x resources decision matrix that check_access would
+    produce. Users are first collapsed to their distinct (role, department, clearance)
+    combinations, the predicates are evaluated once per combination, and the result is
+    expanded back to one row per user.
+    """
+
+    def __init__(self, policy_table=None):
+        policy_table = resources if policy_table is None else policy_table
+        self.resource_names = list(policy_table)
+        policies = [policy_table[name] for name in self.resource_names]
+        # Falsy requirements are not enforced by check_access; '' never matches a real attribute.
+        self.required_role = np.array([p.get('required_role') or '' for p in policies], dtype=str)
+        self.required_department = np.array([p.get('required_department') or '' for p in policies], dtype=str)
+        self.required_clearance = np.array([p.get('required_clearance') or -np.inf for p in policies], dtype=float)
+
+    def evaluate(self, users, resource_names=None):
+        """Decision matrix (n_users x n_resources, bool) for a columnar table or a list of user dicts."""
+        columns = users_to_columns(users) if isinstance(users, list) else users
+        roles, role_codes = np.unique(np.asarray(columns['role'], dtype=str), return_inverse=True)
+        departments, department_codes = np.unique(np.asarray(columns['department'], dtype=str), return_inverse=True)
+        clearances, clearance_codes = np.unique(np.asarray(columns['clearance']), return_inverse=True)
+
+        combo_key = (role_codes.astype(np.int64) * len(departments) + department_codes) * len(clearances) + clearance_codes
+        combos, combo_codes = np.unique(combo_key, return_inverse=True)
+        combo_role = roles[combos // (len(departments) * len(clearances))]
+        combo_department = departments[(combos // len(clearances)) % len(departments)]
+        combo_clearance = clearances[combos % len(clearances)]
+
+        required_role, required_department, required_clearance = self._requirements(resource_names)
+        combo_decisions = (((required_role == '') | (combo_role[:, None] == required_role))
+                           & ((required_department == '') | (combo_department[:, None] == required_department))
+                           & (combo_clearance[:, None] >= required_clearance))
+        return combo_decisions[combo_codes.reshape(-1)]
+
+    def _requirements(self, resource_names):
+        if resource_names is None:
+            return self.required_role, self.required_department, self.required_clearance
+        # check_access allows resources without a policy entry; they map to the extra no-requirement slot.
+        position = {name: i for i, name in enumerate(self.resource_names)}
+        index = np.array([position.get(name, len(self.resource_names)) for name in resource_names], dtype=int)
+        return (np.append(self.required_role, '')[index],
+                np.append(self.required_department, '')[index],
+                np.append(self.required_clearance, -np.inf)[index])
+
+
+def check_access_matrix(users, resource_names=None):
+    """Users x resources decision matrix for the current resources table, identical to check_access."""
+    return CompiledPolicy().evaluate(users, resource_names)
@@ -1,79 +1,131 @@
-import sqlite3, random, abac
+import os, sys, abac
+import numpy as np
 from collections import defaultdict
 
-def load_users():
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import user_tables
+from profiling import NULL_PROFILER, Profiler
+from tracing import ATTEMPT, NULL_TRACER, Tracer
+from user_tables import CHUNK_SIZE, campaign_role_stats, pick_victim, role_codes
+
+DB_PATH = 'loose_rule_company.db'
+USER_QUERY = "SELECT username, role, department, clearance FROM users"
+
+PHISHING_SUCCESS_PROB = {'Admin': 0.11, 'Engineer': 0.11, 'Staff': 0.61}
+PHISHING_DEFAULT_PROB = 0.3
+TOKEN_THEFT_PROB = {'Admin': 0.05, 'Engineer': 0.05, 'Staff': 0.15}
+TOKEN_THEFT_DEFAULT_PROB = 0.2
+
+def _user_dict(row):
+    return {
+        'username': row[0],
+        'role': row[1],
+        'department': row[2],
+        'clearance': row[3]
+    }
+
+def iter_users(db_path=DB_PATH, chunk_size=CHUNK_SIZE):
+    """Stream users as dicts through a cursor, holding at most chunk_size rows at a time."""
+    return user_tables.iter_users(db_path, USER_QUERY, _user_dict, chunk_size)
+
+def load_users(db_path=DB_PATH):
     """Load all users from the database with their full attributes."""
-    conn = sqlite3.connect('loose_rule_company.db')
-    c = conn.cursor()
-    c.execute("SELECT username, role, department, clearance FROM users")
-    users = []
-    for row in c.fetchall():
-        users.append({
-            'username': row[0],
-            'role': row[1],
-            'department': row[2],
-            'clearance': row[3]
-        })
-    conn.close()
-    return users
-
-def simulate_phishing(users, attempts=100):
-    success_prob = {'Admin': 0.11, 'Engineer': 0.11, 'Staff': 0.61}
+    return list(iter_users(db_path))
+
+class UserColumns(user_tables.UserColumns):
+    """The users table as role/department codes and clearances, with user dicts built on demand."""
+
+    def __init__(self, db_path=DB_PATH, chunk_size=CHUNK_SIZE):
+        super().__init__(db_path, USER_QUERY, _user_dict, coded=("role", "department"),
+                         values={"clearance": np.int16}, chunk_size=chunk_size)
+
+    def columns(self):
+        """Columnar table in the form accepted by abac.CompiledPolicy.evaluate."""
+        return {
+            'role': np.array(self.roles, dtype=str)[self.role_codes],
+            'department': np.array(self.vocabularies['department'], dtype=str)[self.codes['department']],
+            'clearance': self.values['clearance'],
+        }
+
+class RowidSampler(user_tables.RowidSampler):
+    """Uniform victim sampling by random rowid, without reading the table."""
+
+    def __init__(self, db_path=DB_PATH, rng=None):
+        super().__init__(db_path, USER_QUERY, _user_dict, rng)
+
+def reservoir_sample(k, db_path=DB_PATH, chunk_size=CHUNK_SIZE, rng=None):
+    """k users drawn uniformly without replacement in one streaming pass (Algorithm R)."""
+    return user_tables.reservoir_sample(k, iter_users(db_path, chunk_size), rng)
+
+def simulate_campaign_batch(users, attempts, success_prob, default_prob, rng=None):
+    """Run a whole campaign with batched draws.
+
+    Victims are drawn uniformly with replacement as in simulate_phishing/simulate_token_theft.
+    Returns (victims, compromised): index arrays into users of every targeted account and of
+    the successfully compromised ones.
+    """
+    rng = np.random.default_rng(rng)
+    codes, roles = role_codes(users)
+    role_prob = np.array([success_prob.get(role, default_prob) for role in roles])
+    victims = rng.integers(len(codes), size=attempts)
+    success = rng.random(attempts) < role_prob[codes[victims]]
+    return victims, victims[success]
+
+def simulate_phishing(users, attempts=100, tracer=NULL_TRACER, rng=None):
+    rng = np.random.default_rng(rng)
+    success_prob = PHISHING_SUCCESS_PROB
     compromised_accounts = []
 
     print("\n==== Phishing Attack Simulation ====")
     for i in range(1, attempts + 1):
-        user = random.choice(users)
+        user = pick_victim(users, rng)
         username = user['username']
         role = user['role']
-        prob = success_prob.get(role, 0.3)
-        if random.random() < prob:
+        prob = success_prob.get(role, PHISHING_DEFAULT_PROB)
+        success = rng.random() < prob
+        if success:
             compromised_accounts.append(user)
-            result = "Success"
-        else:
-            result = "Failed"
-        print(f"Attempt {i:3}: Target={username} (Role={role}) -> {result}")
+        if tracer.level >= ATTEMPT:
+            tracer.event("attempt", i, victim=username, vector="phishing", outcome=success)
 
     print(f"\nPhishing campaign resulted in {len(compromised_accounts)} compromised accounts")
     return compromised_accounts
 
-def simulate_token_theft(users, attempts=100):
-    theft_prob = {'Admin': 0.05, 'Engineer': 0.05, 'Staff': 0.15}
+def simulate_token_theft(users, attempts=100, tracer=NULL_TRACER, rng=None):
+    rng = np.random.default_rng(rng)
+    theft_prob = TOKEN_THEFT_PROB
     compromised_accounts = []
 
     print("\n==== Token Theft Attack Simulation ====")
     for i in range(1, attempts + 1):
-        user = random.choice(users)
+        user = pick_victim(users, rng)
         username = user['username']
         role = user['role']
-        prob = theft_prob.get(role, 0.2)
-        if random.random() < prob:
+        prob = theft_prob.get(role, TOKEN_THEFT_DEFAULT_PROB)
+        success = rng.random() < prob
+        if success:
             compromised_accounts.append(user)
-            result = "Captured"
-        else:
-            result = "Missed"
-        print(f"Attempt {i:3}: User={username} (Role={role}) -> {result}")
+        if tracer.level >= ATTEMPT:
+            tracer.event("attempt", i, victim=username, vector="token_theft", outcome=success)
 
     print(f"\nToken theft campaign resulted in {len(compromised_accounts)} compromised sessions")
     return compromised_accounts
 
-def simulate_resource_access(compromised_accounts):
+def simulate_resource_access(compromised_accounts, vector=None, tracer=NULL_TRACER):
     resources = ['admin_page', 'engineering_page', 'general_page']
     successful_access = defaultdict(int)
     total_attempts = 0
 
     print("\n==== Unauthorized Access Attempts ====")
     for user in compromised_accounts:
-        print(f"\nUsing compromised account: {user['username']} (Role={user['role']}, Dept={user['department']})")
         for resource in resources:
             total_attempts += 1
             access_granted = abac.check_access(user, resource)
             if access_granted:
                 successful_access[resource] += 1
-                result = "ACCESS GRANTED"
-            else:
-                result = "Access Denied"
-            print(f"  Attempt to access {resource}: {result}")
+            if tracer.level >= ATTEMPT:
+                tracer.event("access", total_attempts, victim=user['username'], vector=vector,
+                             resource=resource, decision=access_granted)
 
     return successful_access, total_attempts
 
@@ -105,25 +157,43 @@ def calculate_metrics(successful_access, total_attempts, compromised_accounts):
         'resource_access': successful_access
     }
 
-def run_full_simulation(phishing_attempts=100, token_theft_attempts=100):
-    users = load_users()
-
-    phishing_compromised = simulate_phishing(users, phishing_attempts)
+def run_full_simulation(phishing_attempts=100, token_theft_attempts=100, db_path=DB_PATH, tracer=NULL_TRACER,
+                        seed=None, profiler=NULL_PROFILER):
+    """Phishing and token-theft campaigns followed by ABAC access checks; every draw of the
+    run comes from one generator seeded with `seed`. An enabled `profiler` times the
+    campaign and access phases and counts attempts, compromises and access checks."""
+    rng = np.random.default_rng(seed)
+    users = RowidSampler(db_path, rng)
+
+    with profiler.phase("phishing_campaign"):
+        phishing_compromised = simulate_phishing(users, phishing_attempts, tracer, rng)
+    profiler.count("phishing_attempts", phishing_attempts)
+    profiler.count("phishing_compromised", len(phishing_compromised))
     phishing_success_rate = (len(phishing_compromised) / phishing_attempts) * 100 if phishing_attempts else 0
 
     if phishing_compromised:
         print("\n--- Testing ABAC against phished accounts ---")
-        phishing_access, phishing_total_attempts = simulate_resource_access(phishing_compromised)
+        with profiler.phase("phishing_access"):
+            phishing_access, phishing_total_attempts = simulate_resource_access(phishing_compromised, "phishing",
+                                                                                tracer)
+        profiler.count("access_checks", phishing_total_attempts)
+        profiler.count("access_granted", sum(phishing_access.values()))
         phishing_metrics = calculate_metrics(phishing_access, phishing_total_attempts, phishing_compromised)
     else:
         phishing_metrics = None
 
-    token_compromised = simulate_token_theft(users, token_theft_attempts)
+    with profiler.phase("token_theft_campaign"):
+        token_compromised = simulate_token_theft(users, token_theft_attempts, tracer, rng)
+    profiler.count("token_theft_attempts", token_theft_attempts)
+    profiler.count("token_theft_compromised", len(token_compromised))
     token_success_rate = (len(token_compromised) / token_theft_attempts) * 100 if token_theft_attempts else 0
 
     if token_compromised:
         print("\n--- Testing ABAC against token theft ---")
-        token_access, token_total_attempts = simulate_resource_access(token_compromised)
+        with profiler.phase("token_theft_access"):
+            token_access, token_total_attempts = simulate_resource_access(token_compromised, "token_theft", tracer)
+        profiler.count("access_checks", token_total_attempts)
+        profiler.count("access_granted", sum(token_access.values()))
         token_metrics = calculate_metrics(token_access, token_total_attempts, token_compromised)
     else:
         token_metrics = None
@@ -137,7 +207,9 @@ def run_full_simulation(phishing_attempts=100, token_theft_attempts=100):
 
 if __name__ == "__main__":
     print("=== RUNNING COMPREHENSIVE ABAC SECURITY ASSESSMENT ===")
-    metrics = run_full_simulation(phishing_attempts=100, token_theft_attempts=100)
+    profiler = Profiler()
+    metrics = run_full_simulation(phishing_attempts=100, token_theft_attempts=100,
+                                  tracer=Tracer(ATTEMPT, echo=True), profiler=profiler)
 
     print("\n=== FINAL COMPARISON ===")
     if metrics['phishing'] and metrics['token_theft']:
@@ -149,3 +221,6 @@ if __name__ == "__main__":
     print("\n=== FINAL SUCCESS RATES ===")
     print(f"Phishing attack success rate = {metrics['phishing_success_rate']:.2f}%")
     print(f"Token theft attack success rate = {metrics['token_success_rate']:.2f}%")
+
+    print("\n=== PROFILE ===")
+    print(profiler.format_table())
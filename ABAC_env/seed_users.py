@@ -1,58 +1,91 @@
-import sqlite3, random
-
-conn = sqlite3.connect('loose_rule_company.db')
-c = conn.cursor()
-
-c.execute("DROP TABLE IF EXISTS users")
-c.execute('''
-    CREATE TABLE users (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        username TEXT NOT NULL,
-        role TEXT NOT NULL,
-        department TEXT NOT NULL,
-        clearance INTEGER NOT NULL
-    )
-''')
+import os, sqlite3, sys, time
+import numpy as np
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from user_tables import apportion, draw_weighted
+
+DB_PATH = 'loose_rule_company.db'
+CHUNK_SIZE = 100000
+
+# Role weights; a population of 109 reproduces the original 10 / 40 / 59 split exactly.
 user_distribution = {
     'Admin': 10,
     'Engineer': 40,
     'Staff': 59
 }
 
-staff_departments = ['Support', 'HR', 'Logistics']
-engineer_department = 'Engineering'
-admin_department = 'Administration'
-
-def get_clearance(role):
-    if role == 'Admin':
-        return random.randint(4, 5)
-    elif role == 'Engineer':
-        return random.randint(3, 4)
-    else:
-        return random.randint(1, 3)
-
-user_id = 1
-for role, count in user_distribution.items():
-    for _ in range(count):
-        username = f"user{user_id:02d}"
-        clearance = get_clearance(role)
-
-        if role == 'Admin':
-            department = admin_department
-        elif role == 'Engineer':
-            department = engineer_department
-        else:
-            department = random.choice(staff_departments)
-
-        c.execute('''
+department_distribution = {
+    'Admin': {'Administration': 1},
+    'Engineer': {'Engineering': 1},
+    'Staff': {'Support': 1, 'HR': 1, 'Logistics': 1}
+}
+
+clearance_distribution = {
+    'Admin': {4: 1, 5: 1},
+    'Engineer': {3: 1, 4: 1},
+    'Staff': {1: 1, 2: 1, 3: 1}
+}
+
+def generate_user_chunks(population, roles=user_distribution, departments=department_distribution,
+                         clearances=clearance_distribution, seed=None, chunk_size=CHUNK_SIZE):
+    """Yield lists of (username, role, department, clearance) rows, at most chunk_size rows each.
+
+    Roles are laid out in blocks as in the original seed script; departments and
+    clearances are drawn per user from the given distributions, reproducibly from seed.
+    """
+    rng = np.random.default_rng(seed)
+    user_id = 1
+    for role, count in apportion(roles, population).items():
+        for start in range(0, count, chunk_size):
+            size = min(chunk_size, count - start)
+            usernames = [f"user{uid:02d}" for uid in range(user_id, user_id + size)]
+            yield list(zip(usernames, [role] * size, draw_weighted(rng, departments[role], size),
+                           draw_weighted(rng, clearances[role], size)))
+            user_id += size
+
+def seed_database(db_path=DB_PATH, population=sum(user_distribution.values()), roles=user_distribution,
+                  departments=department_distribution, clearances=clearance_distribution, seed=None,
+                  chunk_size=CHUNK_SIZE):
+    """Rebuild the users table with `population` generated users and report load throughput."""
+    conn = sqlite3.connect(db_path)
+    c = conn.cursor()
+    c.execute("PRAGMA synchronous = OFF")
+    c.execute("PRAGMA journal_mode = MEMORY")
+    c.execute("PRAGMA temp_store = MEMORY")
+    c.execute("PRAGMA cache_size = -200000")
+
+    c.execute("DROP TABLE IF EXISTS users")
+    c.execute('''
+        CREATE TABLE users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL,
+            role TEXT NOT NULL,
+            department TEXT NOT NULL,
+            clearance INTEGER NOT NULL
+        )
+    ''')
+
+    start = time.perf_counter()
+    rows = 0
+    for chunk in generate_user_chunks(population, roles, departments, clearances, seed, chunk_size):
+        c.executemany('''
             INSERT INTO users (username, role, department, clearance)
             VALUES (?, ?, ?, ?)
-        ''', (username, role, department, clearance))
-        
-        user_id += 1
+        ''', chunk)
+        rows += len(chunk)
+    c.execute("CREATE INDEX idx_users_role ON users (role)")
+    c.execute("CREATE INDEX idx_users_department ON users (department)")
+    c.execute("CREATE INDEX idx_users_username ON users (username)")
+    conn.commit()
+    elapsed = time.perf_counter() - start
+    conn.close()
 
-conn.commit()
-conn.close()
+    rows_per_second = rows / elapsed if elapsed > 0 else float('inf')
+    print(f"Loaded {rows} users in {elapsed:.2f}s ({rows_per_second:,.0f} rows/s)")
+    return {'rows': rows, 'seconds': elapsed, 'rows_per_second': rows_per_second}
 
-print("109 users has been created: 10 Admins, 40 Engineers, 59 Staff")
+if __name__ == "__main__":
+    seed_database()
+    counts = apportion(user_distribution, sum(user_distribution.values()))
+    print(f"{sum(counts.values())} users has been created: "
+          f"{counts['Admin']} Admins, {counts['Engineer']} Engineers, {counts['Staff']} Staff")
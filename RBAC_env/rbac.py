@@ -1,13 +1,52 @@
+import os
 import sqlite3
-import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from user_tables import apportion, draw_weighted
 
 DB_PATH = "strict_rule_company.db"
+CHUNK_SIZE = 100_000
 
-def main() -> None:
-    """Create the users table (with a 'compromised' flag) and fill it with
-    a deterministic distribution of Admin, Engineer, and Staff accounts."""
-    conn = sqlite3.connect(DB_PATH)
+# Same role weights as ABAC_env/seed_users.py.
+ROLE_COUNTS = {"Admin": 10, "Engineer": 40, "Staff": 59}
+DEPARTMENTS = {
+    "Admin":    {"Administration": 1},
+    "Engineer": {"Engineering": 1},
+    "Staff":    {"Support": 1, "HR": 1, "Logistics": 1},
+}
+CLEARANCES = {
+    "Admin":    {5: 1},
+    "Engineer": {3: 1},
+    "Staff":    {1: 1},
+}
+
+def generate_user_chunks(population, roles=ROLE_COUNTS, departments=DEPARTMENTS, clearances=CLEARANCES,
+                         seed=None, chunk_size=CHUNK_SIZE):
+    """Yield lists of (username, role, department, clearance, compromised) rows,
+    at most chunk_size rows each, reproducibly from seed."""
+    rng = np.random.default_rng(seed)
+    uid = 1
+    for role, count in apportion(roles, population).items():
+        for start in range(0, count, chunk_size):
+            size = min(chunk_size, count - start)
+            usernames = [f"user{n:02d}" for n in range(uid, uid + size)]
+            yield list(zip(usernames, [role] * size, draw_weighted(rng, departments[role], size),
+                           draw_weighted(rng, clearances[role], size), [0] * size))
+            uid += size
+
+def populate(db_path=DB_PATH, population=sum(ROLE_COUNTS.values()), roles=ROLE_COUNTS, departments=DEPARTMENTS,
+             clearances=CLEARANCES, seed=None, chunk_size=CHUNK_SIZE):
+    """Bulk-load `population` generated users in one transaction and report rows per second."""
+    conn = sqlite3.connect(db_path)
     cur = conn.cursor()
+    cur.execute("PRAGMA synchronous = OFF")
+    cur.execute("PRAGMA journal_mode = MEMORY")
+    cur.execute("PRAGMA temp_store = MEMORY")
+    cur.execute("PRAGMA cache_size = -200000")
 
     cur.execute(
         """
@@ -21,36 +60,29 @@ def main() -> None:
         """
     )
 
-    role_counts = {"Admin": 10, "Engineer": 40, "Staff": 59}
-    staff_departments = ["Support", "HR", "Logistics"]
-
-    sample_rows = []
-    uid = 1
-    for role, count in role_counts.items():
-        for _ in range(count):
-            username = f"user{uid:02d}"
-            uid += 1
-
-            if role == "Admin":
-                department = "Administration"
-                clearance  = 5
-            elif role == "Engineer":
-                department = "Engineering"
-                clearance  = 3
-            else:
-                department = random.choice(staff_departments)
-                clearance  = 1
-
-            sample_rows.append(
-                (username, role, department, clearance, 0)
-            )
-
-    cur.executemany(
-        "INSERT OR REPLACE INTO users VALUES (?,?,?,?,?)",
-        sample_rows,
-    )
+    start = time.perf_counter()
+    rows = 0
+    for chunk in generate_user_chunks(population, roles, departments, clearances, seed, chunk_size):
+        cur.executemany(
+            "INSERT OR REPLACE INTO users VALUES (?,?,?,?,?)",
+            chunk,
+        )
+        rows += len(chunk)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_users_role ON users (role)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_users_department ON users (department)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_users_compromised ON users (compromised)")
     conn.commit()
+    elapsed = time.perf_counter() - start
     conn.close()
+
+    rows_per_second = rows / elapsed if elapsed > 0 else float("inf")
+    print(f"Loaded {rows} users in {elapsed:.2f}s ({rows_per_second:,.0f} rows/s)")
+    return {"rows": rows, "seconds": elapsed, "rows_per_second": rows_per_second}
+
+def main(population=sum(ROLE_COUNTS.values()), seed=None) -> None:
+    """Create the users table (with a 'compromised' flag) and fill it with
+    a deterministic distribution of Admin, Engineer, and Staff accounts."""
+    populate(DB_PATH, population, seed=seed)
     print("Database initialised and populated.")
 
 if __name__ == "__main__":
@@ -1,29 +1,59 @@
-import random
+import atexit
+import os
 import sqlite3
+import sys
+import time
 from collections import defaultdict
+import numpy as np
 import rbac
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import user_tables
+from profiling import NULL_PROFILER, Profiler
+from tracing import ATTEMPT, NULL_TRACER, Tracer
+from user_tables import CHUNK_SIZE, campaign_role_stats, pick_victim, role_codes
+
 DB_PATH = rbac.DB_PATH
 
 PHISH_ATTEMPTS  = 100
 TOKEN_ATTEMPTS  = 100
 DETECTION_PROB  = 0.40 
+FLUSH_INTERVAL  = 1.0   # seconds between write-behind flushes of detection flags
+FLUSH_SIZE      = 256   # pending flags that force a flush
+
+USER_QUERY = "SELECT username, role, compromised FROM users"
+
+def _user_dict(row):
+    return {
+        "username":   row[0],
+        "role":       row[1],
+        "compromised": bool(row[2]),  
+        "breached":   False,
+    }
+
+def iter_users(db_path=DB_PATH, chunk_size=CHUNK_SIZE):
+    """Stream users as dicts through a cursor, holding at most chunk_size rows at a time."""
+    return user_tables.iter_users(db_path, USER_QUERY, _user_dict, chunk_size)
+
+def load_users(db_path=DB_PATH):
+    return list(iter_users(db_path))
+
+class UserColumns(user_tables.UserColumns):
+    """The users table as role codes and compromised flags, with user dicts built on demand."""
+
+    def __init__(self, db_path=DB_PATH, chunk_size=CHUNK_SIZE):
+        super().__init__(db_path, USER_QUERY, _user_dict, coded=("role",), values={"compromised": bool},
+                         chunk_size=chunk_size)
+
+class RowidSampler(user_tables.RowidSampler):
+    """Uniform victim sampling by random rowid, without reading the table."""
+
+    def __init__(self, db_path=DB_PATH, rng=None):
+        super().__init__(db_path, USER_QUERY, _user_dict, rng)
 
-def load_users():
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute("SELECT username, role, compromised FROM users")
-    rows = cur.fetchall()
-    conn.close()
-    return [
-        {
-            "username":   row[0],
-            "role":       row[1],
-            "compromised": bool(row[2]),  
-            "breached":   False,
-        }
-        for row in rows
-    ]
+def reservoir_sample(k, db_path=DB_PATH, chunk_size=CHUNK_SIZE, rng=None):
+    """k users drawn uniformly without replacement in one streaming pass (Algorithm R)."""
+    return user_tables.reservoir_sample(k, iter_users(db_path, chunk_size), rng)
 
 RBAC_POLICIES = {
     "Admin":    ["admin_page", "engineering_page", "general_page"],
@@ -31,57 +61,149 @@ RBAC_POLICIES = {
     "Staff":    ["general_page"],
 }
 
+class RevocationStore:
+    """Write-behind persistence for detection flags.
+
+    Revocations land in an in-memory set immediately, so access checks see them at once,
+    and are written to SQLite over one long-lived WAL connection in batched executemany
+    transactions once `flush_size` flags are pending, and on close(). There is no timer
+    thread: the `flush_interval` is checked on every flag() and is_revoked() call, so while
+    access checks keep coming pending flags reach the database (and other connections)
+    within about `flush_interval` seconds; a store that goes idle holds them until the
+    next call or close().
+    """
+
+    def __init__(self, db_path=DB_PATH, flush_interval=FLUSH_INTERVAL, flush_size=FLUSH_SIZE):
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.revoked = {row[0] for row in self.conn.execute("SELECT username FROM users WHERE compromised = 1")}
+        self.pending = []
+        self.last_flush = time.monotonic()
+
+    def is_revoked(self, username):
+        self._flush_if_due()
+        return username in self.revoked
+
+    def flag(self, username):
+        if username in self.revoked:
+            return
+        self.revoked.add(username)
+        self.pending.append((username,))
+        if len(self.pending) >= self.flush_size:
+            self.flush()
+        else:
+            self._flush_if_due()
+
+    def _flush_if_due(self):
+        if self.pending and time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            with self.conn:
+                self.conn.executemany("UPDATE users SET compromised = 1 WHERE username = ?", self.pending)
+            self.pending = []
+        self.last_flush = time.monotonic()
+
+    def close(self):
+        if self.conn is not None:
+            self.flush()
+            self.conn.close()
+            self.conn = None
+
+_revocation_store = None
+
+def get_revocation_store():
+    """The process-wide RevocationStore, opened on first use and flushed at interpreter exit."""
+    global _revocation_store
+    if _revocation_store is None:
+        _revocation_store = RevocationStore()
+        atexit.register(_revocation_store.close)
+    return _revocation_store
+
+def close_revocation_store():
+    """Flush pending flags and close the process-wide store."""
+    global _revocation_store
+    if _revocation_store is not None:
+        _revocation_store.close()
+        _revocation_store = None
+
 def flag_in_database(username):
-    """Set compromised = 1 in SQLite so future sessions are blocked."""
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute("UPDATE users SET compromised = 1 WHERE username = ?", (username,))
-    conn.commit()
-    conn.close()
-
-def check_rbac_access(user, resource, detection_prob=DETECTION_PROB) -> bool:
+    """Set compromised = 1 in SQLite so future sessions are blocked (written behind, visible immediately)."""
+    get_revocation_store().flag(username)
+
+# Detection draws of check_rbac_access calls that are not given a generator.
+_default_rng = np.random.default_rng()
+
+def check_rbac_access(user, resource, detection_prob=DETECTION_PROB, store=None, tracer=NULL_TRACER,
+                      rng=None) -> bool:
     """
     Enforce RBAC *and* run inline detection.
     Return True *only* if the request is ultimately allowed.
+    Detection is drawn from rng (a module-level generator if none is given).
     """
-    if user["compromised"]:
+    store = store or get_revocation_store()
+    rng = rng if rng is not None else _default_rng
+    if user["compromised"] or store.is_revoked(user["username"]):
         return False
 
     allowed = resource in RBAC_POLICIES.get(user["role"], [])
 
-    if random.random() < detection_prob:
-        print("  !! DETECTED – account disabled")
+    if rng.random() < detection_prob:
+        if tracer.level >= ATTEMPT:
+            tracer.event("detection", victim=user["username"], resource=resource)
         user["compromised"] = True
-        flag_in_database(user["username"])
+        store.flag(user["username"])
         return False
 
     return allowed
 
-def compromise_accounts(users, attempts, odds, label):
+PHISHING_SUCCESS_PROB = {'Admin': 0.11, 'Engineer': 0.11, 'Staff': 0.61}
+TOKEN_THEFT_PROB      = {'Admin': 0.05, 'Engineer': 0.05, 'Staff': 0.15}
+
+def compromise_accounts_batch(users, attempts, odds, rng=None):
+    """Batched compromise_accounts: all victims and outcomes drawn at once.
+
+    Returns (victims, compromised) index arrays into users. Like compromise_accounts,
+    a role missing from odds raises KeyError.
+    """
+    rng = np.random.default_rng(rng)
+    codes, roles = role_codes(users)
+    role_odds = np.array([odds[role] for role in roles])
+    victims = rng.integers(len(codes), size=attempts)
+    success = rng.random(attempts) < role_odds[codes[victims]]
+    return victims, victims[success]
+
+def compromise_accounts(users, attempts, odds, label, vector=None, tracer=NULL_TRACER, rng=None):
     """Generic helper for phishing & token theft."""
+    rng = np.random.default_rng(rng)
     compromised = []
     print(f"\n=== {label} ===")
     for i in range(1, attempts + 1):
-        victim = random.choice(users)
-        if random.random() < odds[victim["role"]]:
+        victim = pick_victim(users, rng)
+        success = rng.random() < odds[victim["role"]]
+        if success:
             victim["breached"] = True
             compromised.append(victim)
-            outcome = "Success"
-        else:
-            outcome = "Failed"
-        print(f"[{i:03}] {victim['username']} ({victim['role']}) → {outcome}")
+        if tracer.level >= ATTEMPT:
+            tracer.event("attempt", i, victim=victim["username"], vector=vector, outcome=success)
     print(f"{len(compromised)} accounts now in attacker hands.")
     return compromised
 
-def simulate_phishing(users, attempts=PHISH_ATTEMPTS):
-    success_prob = {'Admin': 0.11, 'Engineer': 0.11, 'Staff': 0.61}
-    return compromise_accounts(users, attempts, success_prob, "Phishing Campaign")
+def simulate_phishing(users, attempts=PHISH_ATTEMPTS, tracer=NULL_TRACER, rng=None):
+    return compromise_accounts(users, attempts, PHISHING_SUCCESS_PROB, "Phishing Campaign", "phishing", tracer, rng)
 
-def simulate_token_theft(users, attempts=TOKEN_ATTEMPTS):
-    theft_prob   = {'Admin': 0.05, 'Engineer': 0.05, 'Staff': 0.15}
-    return compromise_accounts(users, attempts, theft_prob, "Token-Theft Campaign")
+def simulate_token_theft(users, attempts=TOKEN_ATTEMPTS, tracer=NULL_TRACER, rng=None):
+    return compromise_accounts(users, attempts, TOKEN_THEFT_PROB, "Token-Theft Campaign", "token_theft", tracer, rng)
 
-def simulate_resource_access(breached_accounts, detection_prob=DETECTION_PROB):
+def simulate_resource_access(breached_accounts, detection_prob=DETECTION_PROB, vector=None, tracer=NULL_TRACER,
+                             rng=None, store=None):
+    """Every breached account requests each resource until detected; detections are flagged in `store`
+    (default: the process-wide store on DB_PATH)."""
+    rng = np.random.default_rng(rng)
     resources  = ["admin_page", "engineering_page", "general_page"]
     successes  = defaultdict(int)
     total_reqs = 0
@@ -94,16 +216,15 @@ def simulate_resource_access(breached_accounts, detection_prob=DETECTION_PROB):
         if user["compromised"]:
             continue
 
-        print(f"\n> Attacker uses {user['username']} ({user['role']})")
         for res in resources:
             if user["compromised"]:
                 break
 
             total_reqs += 1
-            allowed = check_rbac_access(user, res, detection_prob)
-
-            result = "ACCESS GRANTED" if allowed else "Access Denied"
-            print(f"  {res:17}: {result}")
+            allowed = check_rbac_access(user, res, detection_prob, store, tracer, rng)
+            if tracer.level >= ATTEMPT:
+                tracer.event("access", total_reqs, victim=user["username"], vector=vector,
+                             resource=res, decision=allowed)
 
             if allowed:
                 successes[res] += 1
@@ -131,15 +252,33 @@ def print_metrics(successes, total, compromised_list, banner):
     for res, n in successes.items():
         print(f"  – {res}: {n}")
 
-def run_full_simulation():
-    users = load_users()
+def run_full_simulation(db_path=DB_PATH, tracer=NULL_TRACER, seed=None, profiler=NULL_PROFILER):
+    """Both campaigns with inline detection; every draw of the run comes from one generator seeded with `seed`.
+
+    An enabled `profiler` times the campaign and access phases and counts compromises and access checks.
+    """
+    rng = np.random.default_rng(seed)
+    users = RowidSampler(db_path, rng)
+    store = RevocationStore(db_path)
 
-    phish_breach = simulate_phishing(users)
-    phish_success, phish_total = simulate_resource_access(phish_breach)
+    with profiler.phase("phishing_campaign"):
+        phish_breach = simulate_phishing(users, tracer=tracer, rng=rng)
+    profiler.count("phishing_compromised", len(phish_breach))
+    with profiler.phase("phishing_access"):
+        phish_success, phish_total = simulate_resource_access(phish_breach, vector="phishing", tracer=tracer, rng=rng,
+                                                              store=store)
+    profiler.count("access_checks", phish_total)
+    profiler.count("access_granted", sum(phish_success.values()))
     print_metrics(phish_success, phish_total, phish_breach, "Phishing")
 
-    token_breach = simulate_token_theft(users)
-    token_success, token_total = simulate_resource_access(token_breach)
+    with profiler.phase("token_theft_campaign"):
+        token_breach = simulate_token_theft(users, tracer=tracer, rng=rng)
+    profiler.count("token_theft_compromised", len(token_breach))
+    with profiler.phase("token_theft_access"):
+        token_success, token_total = simulate_resource_access(token_breach, vector="token_theft", tracer=tracer,
+                                                              rng=rng, store=store)
+    profiler.count("access_checks", token_total)
+    profiler.count("access_granted", sum(token_success.values()))
     print_metrics(token_success, token_total, token_breach, "Token Theft")
     
     print("\n=== FINAL SUCCESS RATES ===")
@@ -155,7 +294,12 @@ def run_full_simulation():
     else:
         print("Token theft attack success rate = N/A (no data)")
 
+    store.close()
+
 if __name__ == "__main__":
     rbac.main()
     print("\n=== RUNNING RBAC SIM WITH INLINE DETECTION ===")
-    run_full_simulation()
+    profiler = Profiler()
+    run_full_simulation(tracer=Tracer(ATTEMPT, echo=True), profiler=profiler)
+    print("\n=== PROFILE ===")
+    print(profiler.format_table())
@@ -0,0 +1,111 @@
+import numpy as np
+
+from attack_rates import ABAC_SUCCESS_RATES, RBAC_SUCCESS_RATES
+from solvers import solve_game_warm
+
+
+class PayoffEstimator:
+    """Per-attempt success rate of each attack against pure RBAC and pure ABAC, from observed breaches.
+
+    An attempt of attack a under RBAC share w succeeds with probability
+    weight_a * (w * rbac_a + (1 - w) * abac_a), as in the hybrid model. The two rates of
+    each attack are a ridge regression of the observed breaches on (w, 1 - w), shrunk
+    toward `prior_rates` with the weight of `prior_weight` attempts: while the policy mix
+    barely moves, the data pins down the rate at the current mix and the prior the rest.
+    """
+
+    def __init__(self, attack_weights, prior_rates=None, prior_weight=1000.0):
+        if prior_rates is None:
+            prior_rates = [RBAC_SUCCESS_RATES, ABAC_SUCCESS_RATES]
+        self.prior_rates = np.asarray(prior_rates, dtype=float)
+        self.attack_weights = np.asarray(attack_weights, dtype=float)
+        self.prior_weight = prior_weight
+        self._attempts = [0] * len(self.attack_weights)
+        self._breaches = [0] * len(self.attack_weights)
+        # Per attack: sums of n, n*w, n*w^2, s and s*w over steps with n attempts, s breaches at RBAC share w.
+        self._sums = [[0.0] * 5 for _ in self._attempts]
+
+    def observe(self, rbac_share, attempts, breaches):
+        """Add the outcomes since the last call; `attempts` and `breaches` are per-attack running totals."""
+        w = rbac_share
+        for sums, total_attempts, seen_attempts, total_breaches, seen_breaches in zip(
+                self._sums, attempts, self._attempts, breaches, self._breaches):
+            n = total_attempts - seen_attempts
+            s = total_breaches - seen_breaches
+            sums[0] += n
+            sums[1] += n * w
+            sums[2] += n * w * w
+            sums[3] += s
+            sums[4] += s * w
+        self._attempts = list(attempts)
+        self._breaches = list(breaches)
+
+    def rates(self):
+        """Estimated rates as a (policy, attack) array, rows RBAC and ABAC like the payoff matrices."""
+        n, nw, nww, s, sw = np.array(self._sums).T
+        weights = self.attack_weights
+        prior = self.prior_weight * weights ** 2
+        # Normal equations in the features (w, 1 - w), scaled by the attack weight.
+        gram = np.empty((len(weights), 2, 2))
+        gram[:, 0, 0] = weights ** 2 * nww + prior
+        gram[:, 0, 1] = gram[:, 1, 0] = weights ** 2 * (nw - nww)
+        gram[:, 1, 1] = weights ** 2 * (n - 2 * nw + nww) + prior
+        moment = np.stack([weights * sw, weights * (s - sw)], axis=1) + prior[:, None] * self.prior_rates.T
+        return np.linalg.solve(gram, moment[..., None])[..., 0].T
+
+
+class AdaptiveEquilibrium:
+    """Periodic re-solve of the hybrid game with payoffs re-estimated from the breaches seen so far.
+
+    Payoffs are the static matrices shifted by `breach_value` per unit of difference between
+    the estimated and the assumed success rates: the defender loses, the attacker gains.
+    Every `every` steps the game is re-solved, warm-started from the supports of the current
+    equilibrium, unless no payoff moved by `tolerance` since the last solve.
+    """
+
+    def __init__(self, defender_payoffs, attacker_payoffs, equilibrium, attack_weights, every=100, tolerance=0.05,
+                 breach_value=20.0, prior_weight=1000.0, solver="auto"):
+        self.base_defender = np.asarray(defender_payoffs, dtype=float)
+        self.base_attacker = np.asarray(attacker_payoffs, dtype=float)
+        self.solved_defender = self.base_defender
+        self.solved_attacker = self.base_attacker
+        self.equilibrium = (np.asarray(equilibrium[0], dtype=float), np.asarray(equilibrium[1], dtype=float))
+        self.estimator = PayoffEstimator(attack_weights, prior_weight=prior_weight)
+        self.every = every
+        self.tolerance = tolerance
+        self.breach_value = breach_value
+        self.solver = solver
+        self.checks = 0
+        self.solves = 0
+        self.warm_starts = 0
+
+    def observe(self, rbac_share, attempts, breaches):
+        self.estimator.observe(rbac_share, attempts, breaches)
+
+    def payoffs(self):
+        shift = self.breach_value * (self.estimator.rates() - self.estimator.prior_rates)
+        return self.base_defender - shift, self.base_attacker + shift
+
+    def maybe_resolve(self, step):
+        """The new equilibrium after every `every`-th step if it was re-solved, else None."""
+        if step % self.every:
+            return None
+        return self.resolve()
+
+    def resolve(self):
+        self.checks += 1
+        defender_payoffs, attacker_payoffs = self.payoffs()
+        change = max(np.abs(defender_payoffs - self.solved_defender).max(),
+                     np.abs(attacker_payoffs - self.solved_attacker).max())
+        if change < self.tolerance:
+            return None
+
+        result = solve_game_warm(defender_payoffs, attacker_payoffs, self.equilibrium, self.solver)
+        self.solves += 1
+        self.warm_starts += result.method == "warm_start"
+        if not result.equilibria:
+            return None
+        # Of several equilibria, follow the one nearest the current defender strategy.
+        self.equilibrium = min(result.equilibria, key=lambda eq: np.abs(eq[0] - self.equilibrium[0]).sum())
+        self.solved_defender, self.solved_attacker = defender_payoffs, attacker_payoffs
+        return self.equilibrium
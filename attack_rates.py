@@ -0,0 +1,5 @@
+ATTACK_STRATEGIES = ["phishing", "token_theft"]
+
+# Per-attempt success rate of each attack in ATTACK_STRATEGIES under a pure policy.
+RBAC_SUCCESS_RATES = (0.16, 0.17)
+ABAC_SUCCESS_RATES = (0.42, 0.12)
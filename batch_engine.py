@@ -0,0 +1,152 @@
+import numpy as np
+
+from attack_rates import ABAC_SUCCESS_RATES, RBAC_SUCCESS_RATES
+
+RECORD_COLUMNS = ("RBAC Policy", "ABAC Policy", "Breach Rate")
+
+
+class ScenarioBatch:
+    """Many access-control scenarios advanced in lockstep along a leading batch axis.
+
+    Every scenario parameter is a scalar or an array broadcast to the batch size S, so
+    one batch can mix policy shares, attacker strategies and controller gains. A hybrid
+    scenario is adaptive and weights success rates by the attacker's strategy
+    probabilities (hybrid.AccessControlModel); a pure ABAC or RBAC scenario is a fixed
+    rbac_share of 0 or 1 with adaptive=False and strategy_weighted=False
+    (pure_abac / pure_rbac).
+
+    A step follows the Mesa models exactly: the breach rate is appended to the history
+    and recorded, then the defender is activated at a uniformly random slot among the
+    attackers. Instead of one draw per attacker, each scenario draws how many attackers
+    pick phishing and how many of them succeed before and after the defender's update
+    as binomial counts, so a step costs the same whatever the number of attackers.
+    """
+
+    def __init__(self, rbac_share=0.5, phishing_prob=0.5, num_attackers=50, adaptive=True, strategy_weighted=True,
+                 K_s=0.15, K_u=0.15, damping_factor=0.7, damping_horizon=50, moving_window=10, rng=None):
+        (rbac_share, phishing_prob, num_attackers, adaptive, strategy_weighted,
+         K_s, K_u, damping_factor, damping_horizon) = np.broadcast_arrays(
+            rbac_share, phishing_prob, num_attackers, adaptive, strategy_weighted,
+            K_s, K_u, damping_factor, damping_horizon)
+        if rbac_share.ndim != 1:
+            raise ValueError("Scenario parameters must be scalars or 1-D arrays.")
+        self.size = len(rbac_share)
+        self.rbac_share = rbac_share.astype(float)
+        self.phishing_prob = phishing_prob.astype(float)
+        self.num_attackers = num_attackers.astype(np.int64)
+        self.adaptive = adaptive.astype(bool)
+        self.strategy_weighted = strategy_weighted.astype(bool)
+        self.K_s = K_s.astype(float)
+        self.K_u = K_u.astype(float)
+        self.damping_factor = damping_factor.astype(float)
+        self.damping_horizon = damping_horizon.astype(float)
+        self.moving_window = moving_window
+        self.rng = np.random.default_rng(rng)
+
+        self.breach_count = np.zeros(self.size, dtype=np.int64)
+        self.access_attempts = np.zeros(self.size, dtype=np.int64)
+        self.target_breach_rate = self.current_breach_rate()
+        self.target_abac_share = np.full(self.size, 0.5)
+        # Last `moving_window` breach rates of every scenario, written round-robin.
+        self.history = np.zeros((self.size, moving_window))
+        self.steps = 0
+
+    def current_breach_rate(self):
+        rate = np.zeros(self.size)
+        np.divide(self.breach_count, self.access_attempts, out=rate, where=self.access_attempts > 0)
+        return rate
+
+    def moving_breach_rate(self):
+        filled = min(self.steps, self.moving_window)
+        if filled == 0:
+            return np.zeros(self.size)
+        return self.history.sum(axis=1) / filled
+
+    def success_probs(self):
+        """(2, S) per-attempt success probability of [phishing, token theft] in every scenario."""
+        rbac = self.rbac_share
+        probs = np.stack([RBAC_SUCCESS_RATES[0] * rbac + ABAC_SUCCESS_RATES[0] * (1 - rbac),
+                          RBAC_SUCCESS_RATES[1] * rbac + ABAC_SUCCESS_RATES[1] * (1 - rbac)])
+        strategy = np.stack([self.phishing_prob, 1 - self.phishing_prob])
+        return np.where(self.strategy_weighted, probs * strategy, probs)
+
+    def record_history(self):
+        self.history[:, self.steps % self.moving_window] = self.current_breach_rate()
+        self.steps += 1
+
+    def defender_step(self):
+        """hybrid.DefenderAgent.step for every adaptive scenario at once."""
+        if self.steps < 3:
+            return
+        error_security = self.moving_breach_rate() - self.target_breach_rate
+        error_usability = self.target_abac_share - (1 - self.rbac_share)
+        delta_rbac = self.K_s * error_security - self.K_u * error_usability
+        adaptive_damping = self.damping_factor * (1 - np.minimum(1.0, self.steps / self.damping_horizon))
+        new_rbac = self.rbac_share * adaptive_damping + (self.rbac_share + delta_rbac) * (1 - adaptive_damping)
+        self.rbac_share = np.where(self.adaptive, np.clip(new_rbac, 0.0, 1.0), self.rbac_share)
+
+    def attack_round(self):
+        rng = self.rng
+        n = self.num_attackers
+        defender_slot = rng.integers(0, n + 1)
+        success_before = self.success_probs()
+        self.defender_step()
+        success_after = self.success_probs()
+
+        phishing_before = rng.binomial(defender_slot, self.phishing_prob)
+        phishing_after = rng.binomial(n - defender_slot, self.phishing_prob)
+        breaches = (rng.binomial(phishing_before, success_before[0])
+                    + rng.binomial(defender_slot - phishing_before, success_before[1])
+                    + rng.binomial(phishing_after, success_after[0])
+                    + rng.binomial(n - defender_slot - phishing_after, success_after[1]))
+        self.access_attempts += n
+        self.breach_count += breaches
+
+    def step(self):
+        self.record_history()
+        self.attack_round()
+
+    def run(self, steps):
+        """Advance every scenario `steps` times; return RECORD_COLUMNS as (steps, S) arrays."""
+        records = {name: np.empty((steps, self.size)) for name in RECORD_COLUMNS}
+        for i in range(steps):
+            self.record_history()
+            records["RBAC Policy"][i] = self.rbac_share
+            records["ABAC Policy"][i] = 1 - self.rbac_share
+            records["Breach Rate"][i] = self.moving_breach_rate()
+            self.attack_round()
+        return records
+
+
+def comparison_batch(attacker_strategy, hybrid_policy_mix, hybrid_attacker_strategy, replications=1,
+                     num_attackers=50, rng=None):
+    """Hybrid, pure ABAC and pure RBAC scenarios, `replications` of each, as one batch.
+
+    Returns the batch and the label ("Hybrid", "ABAC" or "RBAC") of every scenario.
+    """
+    labels = np.repeat(["Hybrid", "ABAC", "RBAC"], replications)
+    hybrid = labels == "Hybrid"
+    batch = ScenarioBatch(
+        rbac_share=np.where(hybrid, hybrid_policy_mix[0], np.where(labels == "RBAC", 1.0, 0.0)),
+        phishing_prob=np.where(hybrid, hybrid_attacker_strategy[0], attacker_strategy[0]),
+        num_attackers=num_attackers,
+        adaptive=hybrid,
+        strategy_weighted=hybrid,
+        rng=rng,
+    )
+    return batch, labels.tolist()
+
+
+if __name__ == "__main__":
+    import time
+
+    gains = np.linspace(0.05, 0.5, 100)
+    batch = ScenarioBatch(rbac_share=0.5, phishing_prob=0.5, K_s=np.repeat(gains, 100), K_u=np.tile(gains, 100),
+                          rng=np.random.default_rng(0))
+    start = time.perf_counter()
+    records = batch.run(100)
+    elapsed = time.perf_counter() - start
+    print(f"{batch.size} scenarios x 100 steps in {elapsed:.2f}s")
+    best = np.argmin(records["Breach Rate"][-1])
+    print(f"Lowest final breach rate {records['Breach Rate'][-1, best]:.4f} at "
+          f"K_s={batch.K_s[best]:.3f}, K_u={batch.K_u[best]:.3f} (RBAC share {records['RBAC Policy'][-1, best]:.3f})")
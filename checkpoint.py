@@ -0,0 +1,84 @@
+import glob
+import os
+import pickle
+import tempfile
+
+import numpy as np
+
+STATE_FILE = "state.pkl"
+
+
+def _atomic_write(path, write):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            write(handle)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+class Checkpointer:
+    """Periodic snapshots of a running model, for resuming a long simulation bit-exactly.
+
+    A snapshot pickles the whole model (policy mix, counters, breach-rate window,
+    defender, scheduler, the model's generator and Mesa's random.Random) with the
+    number of completed steps. The rows of the model's ColumnRecorder are not part of
+    the pickle: each snapshot appends only the rows recorded since the previous one as
+    a numbered .npz segment, so its size does not grow with the run. Every file is
+    written to a temporary name and renamed into place, so a crash mid-write leaves
+    the previous snapshot intact.
+    """
+
+    def __init__(self, directory, every=5000):
+        self.directory = directory
+        self.every = every
+        self.segments = 0
+        self.persisted_rows = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _segment_path(self, index):
+        return os.path.join(self.directory, f"records-{index:05d}.npz")
+
+    def maybe_save(self, model, step):
+        """Save after every `every`-th completed step."""
+        if step % self.every == 0:
+            self.save(model, step)
+
+    def save(self, model, step):
+        recorder = model.datacollector
+        new_rows = recorder.rows(self.persisted_rows)
+        if recorder.count > self.persisted_rows:
+            _atomic_write(self._segment_path(self.segments), lambda handle: np.savez(handle, **new_rows))
+            self.segments += 1
+            self.persisted_rows = recorder.count
+
+        with recorder.pickling_without_rows():
+            state = {"model": model, "step": step, "segments": self.segments}
+            payload = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+        _atomic_write(os.path.join(self.directory, STATE_FILE), lambda handle: handle.write(payload))
+
+    def load(self):
+        """Restore the latest snapshot: returns (model, completed steps), or None if there is none."""
+        try:
+            with open(os.path.join(self.directory, STATE_FILE), "rb") as handle:
+                state = pickle.load(handle)
+        except FileNotFoundError:
+            return None
+        model = state["model"]
+        recorder = model.datacollector
+        for index in range(state["segments"]):
+            with np.load(self._segment_path(index)) as segment:
+                recorder.extend({name: segment[name] for name in recorder.names})
+        self.segments = state["segments"]
+        self.persisted_rows = recorder.count
+        return model, state["step"]
+
+    def clear(self):
+        for path in glob.glob(os.path.join(self.directory, "records-*.npz")) + [
+                os.path.join(self.directory, STATE_FILE)]:
+            if os.path.exists(path):
+                os.remove(path)
+        self.segments = 0
+        self.persisted_rows = 0
@@ -1,25 +1,118 @@
-import matplotlib.pyplot as plt
-from hybrid import run_simulation as run_hybrid_sim
+import contextlib
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+from batch_engine import comparison_batch
+from plotting import plot_band, plot_series
+from hybrid import run_game_theory_analysis, run_simulation as run_hybrid_sim
 from pure_abac import run_simulation as run_abac_sim
 from pure_rbac import run_simulation as run_rbac_sim
 
-def benchmark(steps=100, attacker_strategy=[0.5, 0.5], graph_path="combined_breach_rate_comparison.png"):
+MODEL_COLORS = {"Hybrid": 'red', "ABAC": 'green', "RBAC": 'blue'}
+
+
+def run_replication(task):
+    """Run one seeded, silent replication of a model and return (label, breach rate series).
+
+    `seed` is anything np.random.default_rng accepts, typically a spawned SeedSequence.
+    """
+    label, steps, attacker_strategy, seed = task
+    rng = np.random.default_rng(seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        if label == "Hybrid":
+            results, _ = run_hybrid_sim(steps=steps, rng=rng)
+        elif label == "ABAC":
+            results = run_abac_sim(steps=steps, attacker_strategy=attacker_strategy, rng=rng)
+        else:
+            results = run_rbac_sim(steps=steps, attacker_strategy=attacker_strategy, rng=rng)
+    return label, results["Breach Rate"].to_numpy(dtype=float)
+
+
+def summarize_replications(series, confidence=0.95):
+    """Aggregate replications (one series per row) into mean, lower and upper confidence-band arrays.
+
+    The band is a normal-approximation confidence interval of the per-step mean.
+    """
+    data = np.vstack(series)
+    mean = data.mean(axis=0)
+    if len(data) < 2:
+        return mean, mean.copy(), mean.copy()
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    half_width = z * data.std(axis=0, ddof=1) / np.sqrt(len(data))
+    return mean, mean - half_width, mean + half_width
+
+
+def run_replications(steps, attacker_strategy, replications, workers=None, seed=None):
+    """Run `replications` independent replications of every model across a process pool.
+
+    Every replication gets its own generator, spawned from `seed` by task index, so the
+    streams are independent and results do not depend on the number of workers.
+    """
+    labels = list(MODEL_COLORS)
+    tasks = [(label, steps, attacker_strategy)
+             for _ in range(replications) for label in labels]
+    children = np.random.SeedSequence(seed).spawn(len(tasks))
+    tasks = [task + (child,) for task, child in zip(tasks, children)]
+
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(tasks) // (workers * 4))
+    series = {label: [] for label in labels}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for label, breach_rate in pool.map(run_replication, tasks, chunksize=chunksize):
+            series[label].append(breach_rate)
+    return series
+
+
+def run_batch_replications(steps, attacker_strategy, replications, seed=None):
+    """Same output as run_replications, computed in-process by one lockstep batch_engine.ScenarioBatch."""
+    hybrid_policy_mix, hybrid_attacker_strategy = run_game_theory_analysis()
+    batch, labels = comparison_batch(attacker_strategy, hybrid_policy_mix, hybrid_attacker_strategy, replications,
+                                     rng=np.random.default_rng(seed))
+    breach_rate = batch.run(steps)["Breach Rate"]
+    series = {label: [] for label in MODEL_COLORS}
+    for column, label in enumerate(labels):
+        series[label].append(breach_rate[:, column])
+    return series
+
+
+def benchmark(steps=100, attacker_strategy=[0.5, 0.5], graph_path="combined_breach_rate_comparison.png",
+              replications=1, workers=None, seed=None, confidence=0.95, engine="mesa"):
+    """Plot the breach rate of the hybrid, pure ABAC and pure RBAC models.
+
+    engine="mesa" runs the agent-based models; engine="batch" runs every model and
+    replication together in one batch_engine.ScenarioBatch.
+    """
     if not graph_path:
         raise ValueError("Output graph path must be provided.")
+    if engine not in ("mesa", "batch"):
+        raise ValueError(f"Unknown engine '{engine}'. Choose 'mesa' or 'batch'.")
+    if replications > 1 or engine == "batch":
+        return benchmark_replications(steps, attacker_strategy, graph_path, replications, workers, seed, confidence,
+                                      engine)
+
+    hybrid_rng, abac_rng, rbac_rng = (np.random.default_rng(child) for child in np.random.SeedSequence(seed).spawn(3))
 
     print("\nRunning Hybrid Simulation...")
-    hybrid_results, _ = run_hybrid_sim(steps=steps)
+    hybrid_results, _ = run_hybrid_sim(steps=steps, rng=hybrid_rng)
 
     print("\nRunning Pure ABAC Simulation...")
-    abac_results = run_abac_sim(steps=steps, attacker_strategy=attacker_strategy)
+    abac_results = run_abac_sim(steps=steps, attacker_strategy=attacker_strategy, rng=abac_rng)
 
     print("\nRunning Pure RBAC Simulation...")
-    rbac_results = run_rbac_sim(steps=steps, attacker_strategy=attacker_strategy)
+    rbac_results = run_rbac_sim(steps=steps, attacker_strategy=attacker_strategy, rng=rbac_rng)
+
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
 
     plt.figure(figsize=(12, 8))
-    plt.plot(hybrid_results["Breach Rate"], label="Hybrid", color='red')
-    plt.plot(abac_results["Breach Rate"], label="ABAC", color='green')
-    plt.plot(rbac_results["Breach Rate"], label="RBAC", color='blue')
+    ax = plt.gca()
+    plot_series(ax, hybrid_results["Breach Rate"], label="Hybrid", color='red')
+    plot_series(ax, abac_results["Breach Rate"], label="ABAC", color='green')
+    plot_series(ax, rbac_results["Breach Rate"], label="RBAC", color='blue')
 
     plt.title("Breach Rate Comparison: RBAC vs ABAC vs Hybrid")
     plt.xlabel("Simulation Steps")
@@ -30,7 +123,43 @@ def benchmark(steps=100, attacker_strategy=[0.5, 0.5], graph_path="combined_brea
 
     plt.savefig(graph_path)
     print(f"\nCombined visualization saved to: {graph_path}")
-  
+
+
+def benchmark_replications(steps, attacker_strategy, graph_path, replications, workers=None, seed=None,
+                           confidence=0.95, engine="mesa"):
+    """Monte Carlo version of benchmark: plot mean breach rate with confidence bands per model."""
+    print(f"\nRunning {replications} replications of each model ({engine} engine)...")
+    if engine == "batch":
+        series = run_batch_replications(steps, attacker_strategy, replications, seed)
+    else:
+        series = run_replications(steps, attacker_strategy, replications, workers, seed)
+    summary = {label: summarize_replications(runs, confidence) for label, runs in series.items()}
+
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(12, 8))
+    ax = plt.gca()
+    for label, (mean, lower, upper) in summary.items():
+        color = MODEL_COLORS[label]
+        plot_series(ax, mean, label=f"{label} (mean of {replications})", color=color)
+        plot_band(ax, lower, upper, color=color, alpha=0.2)
+
+    plt.title(f"Breach Rate Comparison: RBAC vs ABAC vs Hybrid ({confidence:.0%} confidence bands)")
+    plt.xlabel("Simulation Steps")
+    plt.ylabel("Moving Average Breach Rate")
+    plt.legend()
+    plt.grid(True, linestyle='--', alpha=0.7)
+    plt.tight_layout()
+
+    plt.savefig(graph_path)
+    print(f"\nCombined visualization saved to: {graph_path}")
+    for label, (mean, lower, upper) in summary.items():
+        print(f"  {label}: final breach rate {mean[-1]:.4f} [{lower[-1]:.4f}, {upper[-1]:.4f}]")
+    return summary
+
+
 if __name__ == "__main__":
     run_steps = 100
     attacker_strategies = [0.5, 0.5]
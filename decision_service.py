@@ -0,0 +1,271 @@
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import queue
+import sqlite3
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+ENV_DIRS = [os.path.join(REPO_DIR, "ABAC_env"), os.path.join(REPO_DIR, "RBAC_env")]
+sys.path[:0] = [path for path in ENV_DIRS if path not in sys.path]
+
+import abac
+import abac_simulation
+import rbac_simulation
+
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), "decision_service.sock")
+DEFAULT_ABAC_DB = os.path.join(REPO_DIR, "ABAC_env", abac_simulation.DB_PATH)
+DEFAULT_RBAC_DB = os.path.join(REPO_DIR, "RBAC_env", rbac_simulation.DB_PATH)
+ENGINES = ("abac", "rbac")
+# Pause reading a connection once this many response bytes wait to be sent.
+WRITE_HIGH_WATER = 1 << 16
+
+
+class ConnectionPool:
+    """A fixed set of query-only SQLite connections, each used by one worker thread at a time."""
+
+    def __init__(self, db_path, size=4):
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(f"No database at {db_path}")
+        self._connections = []
+        self._idle = queue.SimpleQueue()
+        for _ in range(size):
+            conn = sqlite3.connect(db_path, check_same_thread=False)
+            conn.execute("PRAGMA query_only = ON")
+            self._connections.append(conn)
+            self._idle.put(conn)
+
+    @contextlib.contextmanager
+    def connection(self):
+        conn = self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        for conn in self._connections:
+            conn.close()
+
+
+def ensure_username_index(db_path):
+    """Index users.username (databases seeded before the index existed lack it)."""
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"No database at {db_path}")
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_users_username ON users (username)")
+    finally:
+        conn.close()
+
+
+def _reply(future, response):
+    if not future.done():
+        future.set_result(response)
+
+
+class DecisionService:
+    """ABAC and RBAC access decisions for concurrent requests, made in batches.
+
+    Requests wait in a queue while earlier batches are in flight; the batcher then takes
+    everything queued (up to `max_batch`) as one batch. Each engine's users in the batch
+    are read with one query on a pooled SQLite connection in a worker thread, and every
+    request is decided by the engine's own code: abac.check_access_cached, and
+    rbac_simulation.check_rbac_access, whose revocation check sees both the compromised
+    flag just read and the RevocationStore that inline detection writes behind to.
+    At most `pool_size` batches are in flight, so extra load makes batches larger
+    rather than adding queries.
+    """
+
+    def __init__(self, abac_db=DEFAULT_ABAC_DB, rbac_db=DEFAULT_RBAC_DB, pool_size=4, max_batch=256,
+                 detection_prob=rbac_simulation.DETECTION_PROB, seed=None):
+        for db_path in (abac_db, rbac_db):
+            ensure_username_index(db_path)
+        self.pools = {"abac": ConnectionPool(abac_db, pool_size), "rbac": ConnectionPool(rbac_db, pool_size)}
+        self.queries = {"abac": abac_simulation.USER_QUERY, "rbac": rbac_simulation.USER_QUERY}
+        self.user_dicts = {"abac": abac_simulation._user_dict, "rbac": rbac_simulation._user_dict}
+        self.revocations = rbac_simulation.RevocationStore(rbac_db)
+        self.executor = ThreadPoolExecutor(pool_size)
+        self.pool_size = pool_size
+        self.max_batch = max_batch
+        self.detection_prob = detection_prob
+        self.rng = np.random.default_rng(seed)
+        self.batches = 0
+        self.decisions = 0
+        self._queue = None
+        self._slots = None
+        self._tasks = set()
+
+    def start(self):
+        """Start the batcher on the running event loop."""
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.pool_size)
+        self._keep(asyncio.create_task(self._run_batcher()))
+
+    def _keep(self, task):
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def submit(self, request):
+        """Queue a request {"id", "engine", "username", "resource"}; returns a future of its response."""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((request, future))
+        return future
+
+    async def _run_batcher(self):
+        while True:
+            await self._slots.acquire()
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            task = asyncio.create_task(self._decide_batch(batch))
+            task.add_done_callback(lambda _: self._slots.release())
+            self._keep(task)
+
+    def _lookup(self, engine, usernames):
+        query = self.queries[engine] + f" WHERE username IN ({','.join('?' * len(usernames))})"
+        with self.pools[engine].connection() as conn:
+            rows = conn.execute(query, usernames).fetchall()
+        user_dict = self.user_dicts[engine]
+        return {row[0]: user_dict(row) for row in rows}
+
+    def _decide(self, engine, user, resource):
+        if engine == "abac":
+            return abac.check_access_cached(user, resource)
+        return rbac_simulation.check_rbac_access(user, resource, self.detection_prob, self.revocations,
+                                                 rng=self.rng)
+
+    async def _decide_batch(self, batch):
+        self.batches += 1
+        loop = asyncio.get_running_loop()
+        by_engine = {engine: [] for engine in ENGINES}
+        try:
+            for request, future in batch:
+                if (request.get("engine") not in ENGINES or not isinstance(request.get("username"), str)
+                        or not isinstance(request.get("resource"), str)):
+                    _reply(future, {"id": request.get("id"), "error": "expected engine ('abac' or 'rbac'), "
+                                                                       "username and resource as strings"})
+                else:
+                    by_engine[request["engine"]].append((request, future))
+
+            engines = [engine for engine in ENGINES if by_engine[engine]]
+            lookups = [loop.run_in_executor(self.executor, self._lookup, engine,
+                                            list({request["username"] for request, _ in by_engine[engine]}))
+                       for engine in engines]
+            for engine, users in zip(engines, await asyncio.gather(*lookups, return_exceptions=True)):
+                for request, future in by_engine[engine]:
+                    if isinstance(users, Exception):
+                        response = {"id": request.get("id"), "error": f"user lookup failed: {users}"}
+                    elif request["username"] not in users:
+                        response = {"id": request.get("id"), "allow": False, "reason": "unknown user"}
+                    else:
+                        try:
+                            allow = self._decide(engine, users[request["username"]], request["resource"])
+                        except Exception as error:
+                            response = {"id": request.get("id"), "error": f"decision failed: {error}"}
+                        else:
+                            response = {"id": request.get("id"), "allow": bool(allow)}
+                            self.decisions += 1
+                    _reply(future, response)
+        finally:
+            # Whatever went wrong, no request of the batch is left waiting.
+            for request, future in batch:
+                _reply(future, {"id": request.get("id"), "error": "batch failed"})
+
+    async def handle_connection(self, reader, writer):
+        """Serve newline-delimited JSON requests; responses come back as they are decided, tagged by id."""
+        pending = set()
+
+        def send(response):
+            if not writer.is_closing():
+                writer.write(json.dumps(response).encode() + b"\n")
+
+        def on_done(future):
+            pending.discard(future)
+            if not future.cancelled():
+                send(future.result())
+
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    send({"error": "invalid JSON"})
+                    continue
+                if not isinstance(request, dict):
+                    send({"error": "expected a JSON object"})
+                    continue
+                future = self.submit(request)
+                pending.add(future)
+                future.add_done_callback(on_done)
+                if writer.transport.get_write_buffer_size() > WRITE_HIGH_WATER:
+                    await writer.drain()
+            if pending:
+                await asyncio.wait(pending)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def close(self):
+        """Release the pools and flush pending revocations; call once the event loop has stopped."""
+        self.executor.shutdown()
+        for pool in self.pools.values():
+            pool.close()
+        self.revocations.close()
+
+
+async def serve(service, socket_path=DEFAULT_SOCKET, port=None):
+    """Run the service on a Unix socket, or on 127.0.0.1:`port` when a port is given."""
+    service.start()
+    if port is not None:
+        server = await asyncio.start_server(service.handle_connection, "127.0.0.1", port)
+        where = f"127.0.0.1:{port}"
+    else:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = await asyncio.start_unix_server(service.handle_connection, socket_path)
+        where = socket_path
+    print(f"Decision service listening on {where}", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if port is None and os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local ABAC/RBAC access decision service.")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Unix socket path to listen on")
+    parser.add_argument("--port", type=int, help="listen on 127.0.0.1:PORT instead of a Unix socket")
+    parser.add_argument("--abac-db", default=DEFAULT_ABAC_DB, help="ABAC users database (seed_users.py)")
+    parser.add_argument("--rbac-db", default=DEFAULT_RBAC_DB, help="RBAC users database (rbac.py)")
+    parser.add_argument("--pool-size", type=int, default=4, help="SQLite connections per database")
+    parser.add_argument("--max-batch", type=int, default=256, help="most requests decided in one batch")
+    parser.add_argument("--detection-prob", type=float, default=rbac_simulation.DETECTION_PROB,
+                        help="RBAC inline detection probability per request")
+    parser.add_argument("--seed", type=int, help="seed of the detection draws")
+    args = parser.parse_args(argv)
+
+    service = DecisionService(args.abac_db, args.rbac_db, args.pool_size, args.max_batch, args.detection_prob,
+                              args.seed)
+    try:
+        asyncio.run(serve(service, args.socket, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+        print(f"Served {service.decisions} decisions in {service.batches} batches")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+
+import numpy as np
+
+CACHE_DIR = os.environ.get(
+    "EQUILIBRIUM_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".equilibrium_cache"),
+)
+
+
+def game_key(defender_payoffs, attacker_payoffs, solver):
+    """Content address of a game: SHA-256 over the solver name and both payoff matrices."""
+    digest = hashlib.sha256(solver.encode())
+    for payoffs in (defender_payoffs, attacker_payoffs):
+        matrix = np.ascontiguousarray(payoffs, dtype=np.float64)
+        digest.update(str(matrix.shape).encode())
+        digest.update(matrix.tobytes())
+    return digest.hexdigest()
+
+
+class EquilibriumCache:
+    """Content-addressed equilibrium store: an in-process LRU in front of .npz files on disk."""
+
+    def __init__(self, directory=CACHE_DIR, maxsize=256):
+        self.directory = directory
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.npz")
+
+    def get(self, key):
+        """Return the cached list of (defender, attacker) strategy arrays, or None on a miss."""
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return self._memory[key]
+        try:
+            with np.load(self._path(key)) as stored:
+                equilibria = list(zip(stored["defender"], stored["attacker"]))
+        except (OSError, KeyError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._remember(key, equilibria)
+        return equilibria
+
+    def put(self, key, equilibria):
+        """Store equilibria in memory and, best effort, on disk (written atomically).
+
+        An unusable cache directory only costs the disk copy; the entry stays in memory.
+        """
+        self._remember(key, equilibria)
+        path = self._path(key)
+        tmp_path = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as handle:
+                np.savez(handle,
+                         defender=np.array([p for p, _ in equilibria], dtype=np.float64),
+                         attacker=np.array([q for _, q in equilibria], dtype=np.float64))
+            os.replace(tmp_path, path)
+        except OSError:
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _remember(self, key, equilibria):
+        self._memory[key] = equilibria
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def clear_memory(self):
+        self._memory.clear()
+
+
+default_cache = EquilibriumCache()
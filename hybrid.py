@@ -1,30 +1,50 @@
 import numpy as np
-import nashpy as nash
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
 from mesa import Model, Agent
 from mesa.time import RandomActivation
-from mesa.datacollection import DataCollector
-
-
-def run_game_theory_analysis():
-    """Run game theory analysis and return the equilibria as a list [defender_strategy, attacker_strategy]"""
-    defender_payoffs = [[4.1, -4],
-                        [-2.8, 4.2]]
-
-    attacker_payoffs = [[-0.8, 0.8],
-                        [2.1, -0.6]]
-    
-    game = nash.Game(defender_payoffs, attacker_payoffs)
-    equilibria = list(game.support_enumeration())
-    
-    print("\n=== Game Theory Analysis ===\n")
-    print("Nash Equilibria:")
-    for i, (p1_strategy, p2_strategy) in enumerate(equilibria):
-        print(f"Equilibrium {i+1}:")
-        print("  Player 1 strategy (Defender):", p1_strategy)
-        print("  Player 2 strategy (Attacker):", p2_strategy)
+from adaptive import AdaptiveEquilibrium
+from attack_rates import ABAC_SUCCESS_RATES, ATTACK_STRATEGIES, RBAC_SUCCESS_RATES
+from checkpoint import Checkpointer
+from equilibrium_cache import default_cache, game_key
+from recorder import ColumnRecorder
+from streaming_stats import RollingStats
+from solvers import choose_method, solve_game
+from plotting import plot_series
+from profiling import NULL_PROFILER
+from tracing import NULL_TRACER, STEP, Tracer
+
+
+DEFENDER_PAYOFFS = [[4.1, -4],
+                    [-2.8, 4.2]]
+
+ATTACKER_PAYOFFS = [[-0.8, 0.8],
+                    [2.1, -0.6]]
+
+
+def run_game_theory_analysis(defender_payoffs=DEFENDER_PAYOFFS, attacker_payoffs=ATTACKER_PAYOFFS, solver="auto",
+                             time_budget=None, cache=default_cache):
+    """Run game theory analysis and return the equilibria as a list [defender_strategy, attacker_strategy]
+
+    Payoffs may be any n x m game; `solver` is "auto" or a name from solvers.SOLVERS.
+    Equilibria are looked up in `cache` by payoff matrices and solver; pass cache=None to always solve.
+    """
+    if solver == "auto":
+        solver = choose_method(np.asarray(defender_payoffs, dtype=float), np.asarray(attacker_payoffs, dtype=float))
+    key = game_key(defender_payoffs, attacker_payoffs, solver)
+    equilibria = cache.get(key) if cache is not None else None
+    if equilibria is None:
+        result = solve_game(defender_payoffs, attacker_payoffs, solver, time_budget)
+        equilibria = result.equilibria
+        if cache is not None and not result.timed_out:
+            cache.put(key, equilibria)
+
+        print("\n=== Game Theory Analysis ===\n")
+        print(f"Solver: {result.method} ({result.solve_time * 1000:.2f} ms"
+              f"{', time budget exhausted' if result.timed_out else ''})")
+        print("Nash Equilibria:")
+        for i, (p1_strategy, p2_strategy) in enumerate(equilibria):
+            print(f"Equilibrium {i+1}:")
+            print("  Player 1 strategy (Defender):", p1_strategy)
+            print("  Player 2 strategy (Attacker):", p2_strategy)
 
     if not equilibria:
         raise ValueError("No Nash Equilibrium found.")
@@ -34,8 +54,12 @@ def run_game_theory_analysis():
 
 class AccessControlModel(Model):
     """Mesa model for access control simulation"""
-    def __init__(self, num_employees=100, num_attackers=50, initial_policy_mix=(0.5, 0.5), attacker_strategy=(0.5, 0.5)):
+    def __init__(self, num_employees=100, num_attackers=50, initial_policy_mix=(0.5, 0.5), attacker_strategy=(0.5, 0.5), vectorized=False, defender_params=None, horizon=None, record_every=1, rng=None, profiler=NULL_PROFILER, resolver=None):
         super().__init__()
+        # All draws come from this generator (a Generator, a seed or None); Mesa's own
+        # random.Random, which orders the schedule, is seeded from it too.
+        self.rng = np.random.default_rng(rng)
+        self.reset_randomizer(int(self.rng.integers(2**63)))
         self.schedule = RandomActivation(self)
         self.num_employees = num_employees
         self.num_attackers = num_attackers
@@ -43,24 +67,37 @@ class AccessControlModel(Model):
         self.attacker_strategy = attacker_strategy
         self.breach_count = 0
         self.access_attempts = 0
-        self.breach_rates_history = []
+        # Running totals per attack, indexed like ATTACK_STRATEGIES.
+        self.vector_attempts = [0, 0]
+        self.vector_breaches = [0, 0]
         self.moving_window = 10
-        
-        for i in range(self.num_attackers):
-            attacker_id = i + self.num_employees
-            attacker = AttackerAgent(attacker_id, self)
-            self.schedule.add(attacker)
+        self.breach_stats = RollingStats(self.moving_window)
+        self.vectorized = vectorized
+        self.profiler = profiler
+
+        if self.vectorized:
+            # Attackers live in arrays instead of one AttackerAgent per attacker.
+            # Codes follow ATTACK_STRATEGIES: 0 = phishing, 1 = token theft.
+            self.attack_strategies = np.zeros(self.num_attackers, dtype=np.int8)
+            self.attack_outcomes = np.zeros(self.num_attackers, dtype=bool)
+        else:
+            for i in range(self.num_attackers):
+                attacker_id = i + self.num_employees
+                attacker = AttackerAgent(attacker_id, self)
+                self.schedule.add(attacker)
         
         defender_id = self.num_employees + self.num_attackers + 1
-        self.defender = DefenderAgent(defender_id, self)
+        self.defender = DefenderAgent(defender_id, self, **(defender_params or {}))
         self.schedule.add(self.defender)
+
+        # An AdaptiveEquilibrium re-solves the game as breaches come in and retargets the defender.
+        self.resolver = resolver
+        if resolver is not None:
+            self.defender.target_abac_share = resolver.equilibrium[0][1]
         
-        self.datacollector = DataCollector(
-            model_reporters={
-                "RBAC Policy": lambda m: m.policy_mix[0],
-                "ABAC Policy": lambda m: m.policy_mix[1],
-                "Breach Rate": lambda m: m.get_moving_breach_rate()
-            }
+        self.datacollector = ColumnRecorder(
+            {"RBAC Policy": np.float64, "ABAC Policy": np.float64, "Breach Rate": np.float64},
+            horizon=horizon, every=record_every,
         )
 
     def get_current_breach_rate(self):
@@ -69,15 +106,73 @@ class AccessControlModel(Model):
         return self.breach_count / self.access_attempts
 
     def get_moving_breach_rate(self):
-        if len(self.breach_rates_history) == 0:
-            return 0
-        return np.mean(self.breach_rates_history[-self.moving_window:])
+        return self.breach_stats.mean()
+
+    def attack_success_probs(self):
+        """Per-attempt success probability of [phishing, token theft], as in AttackerAgent.execute_attack."""
+        rbac_weight = self.policy_mix[0]
+        phishing_prob, token_theft_prob = self.attacker_strategy
+        phishing_success = RBAC_SUCCESS_RATES[0] * rbac_weight + ABAC_SUCCESS_RATES[0] * (1 - rbac_weight)
+        token_theft_success = RBAC_SUCCESS_RATES[1] * rbac_weight + ABAC_SUCCESS_RATES[1] * (1 - rbac_weight)
+        return np.array([phishing_success * phishing_prob, token_theft_success * token_theft_prob])
 
     def step(self):
-        current_rate = self.get_current_breach_rate()
-        self.breach_rates_history.append(current_rate)
-        self.datacollector.collect(self)
-        self.schedule.step()
+        profiler = self.profiler
+        with profiler.phase("breach_stats"):
+            current_rate = self.get_current_breach_rate()
+            self.breach_stats.push(current_rate)
+        with profiler.phase("moving_breach_rate"):
+            breach_rate_ma = self.get_moving_breach_rate()
+        with profiler.phase("record"):
+            self.datacollector.record(self.policy_mix[0], self.policy_mix[1], breach_rate_ma)
+        rbac_share = self.policy_mix[0]
+        if self.vectorized:
+            self.step_vectorized()
+        else:
+            self.schedule.step()
+        if self.resolver is not None:
+            with profiler.phase("resolve"):
+                self.resolver.observe(rbac_share, self.vector_attempts, self.vector_breaches)
+                equilibrium = self.resolver.maybe_resolve(self.schedule.steps)
+                if equilibrium is not None:
+                    self.defender.target_abac_share = equilibrium[0][1]
+        profiler.count("steps")
+
+    def step_vectorized(self):
+        """Run every attacker and the defender for one step using batched draws.
+
+        RandomActivation activates the defender at a uniformly random slot among
+        the attackers, so attackers ahead of it attack under the old policy mix
+        and the rest under the updated one. The defender only reads the breach
+        history, so it can be stepped first and the slot drawn explicitly.
+        """
+        n = self.num_attackers
+        profiler = self.profiler
+        defender_slot = self.rng.integers(n + 1)
+        success_before = self.attack_success_probs()
+        self.defender.step()
+        success_after = self.attack_success_probs()
+
+        with profiler.phase("attackers"):
+            strategies = (self.rng.random(n) >= self.attacker_strategy[0]).astype(np.int8)
+            success_probs = success_after[strategies]
+            success_probs[:defender_slot] = success_before[strategies[:defender_slot]]
+            outcomes = self.rng.random(n) < success_probs
+        profiler.count("attacks", n)
+
+        self.attack_strategies = strategies
+        self.attack_outcomes = outcomes
+        self.access_attempts += n
+        breaches = int(np.count_nonzero(outcomes))
+        self.breach_count += breaches
+        token_thefts = int(np.count_nonzero(strategies))
+        token_theft_breaches = int(np.count_nonzero(outcomes & strategies.view(bool)))
+        self.vector_attempts[0] += n - token_thefts
+        self.vector_attempts[1] += token_thefts
+        self.vector_breaches[0] += breaches - token_theft_breaches
+        self.vector_breaches[1] += token_theft_breaches
+        self.schedule.steps += 1
+        self.schedule.time += 1
 
 
 class AttackerAgent(Agent):
@@ -86,36 +181,46 @@ class AttackerAgent(Agent):
         self.attack_strategy = "phishing"
 
     def step(self):
-        self.attack_strategy = np.random.choice(["phishing", "token_theft"], p=self.model.attacker_strategy)
-        self.model.access_attempts += 1
-        if self.execute_attack():
-            self.model.breach_count += 1
+        with self.model.profiler.phase("attackers"):
+            code = self.model.rng.choice(2, p=self.model.attacker_strategy)
+            self.attack_strategy = ATTACK_STRATEGIES[code]
+            self.model.access_attempts += 1
+            self.model.vector_attempts[code] += 1
+            if self.execute_attack():
+                self.model.breach_count += 1
+                self.model.vector_breaches[code] += 1
+        self.model.profiler.count("attacks")
 
     def execute_attack(self):
         rbac_weight = self.model.policy_mix[0]
         phishing_prob, token_theft_prob = self.model.attacker_strategy
 
         if self.attack_strategy == "phishing":
-            base_success = 0.16 * rbac_weight + 0.42 * (1 - rbac_weight)
-            return np.random.rand() < (base_success * phishing_prob)
+            base_success = RBAC_SUCCESS_RATES[0] * rbac_weight + ABAC_SUCCESS_RATES[0] * (1 - rbac_weight)
+            return self.model.rng.random() < (base_success * phishing_prob)
         else:
-            base_success = 0.17 * rbac_weight + 0.12 * (1 - rbac_weight)
-            return np.random.rand() < (base_success * token_theft_prob)
+            base_success = RBAC_SUCCESS_RATES[1] * rbac_weight + ABAC_SUCCESS_RATES[1] * (1 - rbac_weight)
+            return self.model.rng.random() < (base_success * token_theft_prob)
 
 
 class DefenderAgent(Agent):
-    def __init__(self, unique_id, model):
+    def __init__(self, unique_id, model, K_s=0.15, K_u=0.15, damping_factor=0.7, damping_horizon=50):
         super().__init__(unique_id, model)
-        self.K_s = 0.15  
-        self.K_u = 0.15   
-        self.damping_factor = 0.7  
+        self.K_s = K_s
+        self.K_u = K_u
+        self.damping_factor = damping_factor
+        self.damping_horizon = damping_horizon
         initial_breach = self.model.get_current_breach_rate()
         self.target_breach_rate = initial_breach
         self.target_abac_share = 0.5
         self.previous_policy_mix = model.policy_mix
 
     def step(self):
-        if len(self.model.breach_rates_history) < 3:
+        with self.model.profiler.phase("defender"):
+            self.update_policy_mix()
+
+    def update_policy_mix(self):
+        if len(self.model.breach_stats) < 3:
             return
 
         breach_rate_ma = self.model.get_moving_breach_rate()
@@ -123,8 +228,8 @@ class DefenderAgent(Agent):
         error_security = breach_rate_ma - self.target_breach_rate
         error_usability = self.target_abac_share - abac
         delta_rbac = (self.K_s * error_security) - (self.K_u * error_usability)
-        step_count = len(self.model.breach_rates_history)
-        adaptive_damping = self.damping_factor * (1 - min(1.0, step_count / 50))
+        step_count = len(self.model.breach_stats)
+        adaptive_damping = self.damping_factor * (1 - min(1.0, step_count / self.damping_horizon))
         new_rbac_raw = rbac + delta_rbac
         new_rbac = rbac * adaptive_damping + new_rbac_raw * (1 - adaptive_damping)
         new_rbac = max(0.0, min(new_rbac, 1.0))
@@ -133,18 +238,50 @@ class DefenderAgent(Agent):
         self.previous_policy_mix = (new_rbac, new_abac)
 
 
-def run_simulation(steps=100):
+def run_simulation(steps=100, num_attackers=50, vectorized=False, tracer=NULL_TRACER, trace_interval=10,
+                   record_every=1, checkpoint_dir=None, checkpoint_every=5000, resume=False, rng=None,
+                   profiler=NULL_PROFILER, resolve_every=None, resolve_tolerance=0.05):
+    """Run the hybrid model for `steps` steps and return (results, equilibria).
+
+    With a `checkpoint_dir` the model is snapshotted every `checkpoint_every` steps;
+    resume=True continues from the latest snapshot there instead of starting over.
+    `rng` (a numpy Generator, a seed or None) drives every random draw of the run.
+    An enabled `profiler` times each phase of the model's step; its table is printed at the end.
+    With `resolve_every` the game is re-solved every that many steps from payoffs re-estimated
+    from the observed breaches (skipped while they move by less than `resolve_tolerance`),
+    and the defender's ABAC target follows the equilibrium.
+    """
     print("\n=== Agent-Based Simulation ===\n")
     equilibria = run_game_theory_analysis()
     defender_strategy = equilibria[0]
     attacker_strategy = equilibria[1]
 
-    model = AccessControlModel(
-        num_employees=100,
-        num_attackers=50,
-        initial_policy_mix=tuple(defender_strategy),
-        attacker_strategy=attacker_strategy
-    )
+    checkpointer = Checkpointer(checkpoint_dir, checkpoint_every) if checkpoint_dir else None
+    restored = checkpointer.load() if checkpointer and resume else None
+    if restored:
+        model, start_step = restored
+        model.profiler = profiler
+        print(f"Resumed from checkpoint at step {start_step}")
+    else:
+        if checkpointer:
+            checkpointer.clear()
+        start_step = 0
+        resolver = None
+        if resolve_every:
+            resolver = AdaptiveEquilibrium(DEFENDER_PAYOFFS, ATTACKER_PAYOFFS, equilibria, attacker_strategy,
+                                           every=resolve_every, tolerance=resolve_tolerance)
+        model = AccessControlModel(
+            num_employees=100,
+            num_attackers=num_attackers,
+            initial_policy_mix=tuple(defender_strategy),
+            attacker_strategy=attacker_strategy,
+            vectorized=vectorized,
+            horizon=steps,
+            record_every=record_every,
+            rng=rng,
+            profiler=profiler,
+            resolver=resolver
+        )
 
     print("Initial state:")
     print(f"  Number of employees: {model.num_employees}")
@@ -152,11 +289,12 @@ def run_simulation(steps=100):
     print(f"  Initial policy mix (RBAC, ABAC): {model.policy_mix}")
 
     print("\nRunning simulation...")
-    for i in range(steps):
+    for i in range(start_step, steps):
         model.step()
-        if i % 10 == 0:
-            breach_ma = model.get_moving_breach_rate()
-            print(f"Step {i}: Policy mix = {model.policy_mix}, Moving Average breach = {breach_ma:.4f}")
+        if tracer.level >= STEP and i % trace_interval == 0:
+            tracer.event("step", i, rbac_share=model.policy_mix[0], breach_rate=model.get_moving_breach_rate())
+        if checkpointer:
+            checkpointer.maybe_save(model, i + 1)
 
     results = model.datacollector.get_model_vars_dataframe()
     final_rbac, final_abac = model.policy_mix
@@ -170,16 +308,31 @@ def run_simulation(steps=100):
     print(f"  Final (instant) breach rate: {final_breach_rate:.4f}")
     print(f"  Final (moving average) breach rate: {final_breach_ma:.4f}")
 
+    if model.resolver is not None:
+        resolver = model.resolver
+        print(f"  Equilibrium checks: {resolver.checks}, re-solves: {resolver.solves} "
+              f"({resolver.warm_starts} warm-started)")
+        print(f"  Final equilibrium (defender): {np.round(resolver.equilibrium[0], 3).tolist()}")
+
+    if profiler.enabled:
+        print("\nStep profile:")
+        print(profiler.format_table())
+
     return results, equilibria
 
 
 def create_visualization(results, equilibria):
     print("\n=== Visualization ===\n")
+    # Loaded here so that importing the model stays headless and fast.
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(12, 8))
 
     plt.subplot(2, 1, 1)
-    plt.plot(results["RBAC Policy"], label="RBAC")
-    plt.plot(results["ABAC Policy"], label="ABAC")
+    plot_series(plt.gca(), results["RBAC Policy"], label="RBAC")
+    plot_series(plt.gca(), results["ABAC Policy"], label="ABAC")
     plt.title("Policy Mix Evolution Over Time")
     plt.ylabel("Policy Mix")
     plt.legend()
@@ -187,7 +340,7 @@ def create_visualization(results, equilibria):
     plt.ylim(0, 1)
 
     plt.subplot(2, 1, 2)
-    plt.plot(results["Breach Rate"], label="Moving Average Breach", color='red')
+    plot_series(plt.gca(), results["Breach Rate"], label="Moving Average Breach", color='red')
     plt.title("Security Breach Rate Over Time (Moving Average)")
     plt.xlabel("Simulation Steps")
     plt.ylabel("Breach Rate")
@@ -212,6 +365,6 @@ if __name__ == "__main__":
     print("=== Access Control Policy Modeling ===")
     print("Combining Game Theory and Agent-Based Simulation\n")
 
-    sim_results, eq = run_simulation(steps=100)
+    sim_results, eq = run_simulation(steps=100, tracer=Tracer(STEP, echo=True))
     create_visualization(sim_results, eq)
     print("\n=== Analysis Complete ===")
@@ -0,0 +1,176 @@
+import argparse
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from decision_service import DEFAULT_ABAC_DB, DEFAULT_RBAC_DB, DEFAULT_SOCKET, REPO_DIR
+# decision_service has put the environment directories on sys.path.
+import abac_simulation
+import rbac_simulation
+
+RESOURCES = ["admin_page", "engineering_page", "general_page"]
+
+
+def campaign_requests(engine, usernames, compromised, vector):
+    """Requests of every compromised account for every resource, as in simulate_resource_access."""
+    return [{"engine": engine, "username": usernames(i), "resource": resource, "vector": vector}
+            for i in compromised for resource in RESOURCES]
+
+
+def build_traffic(abac_db=DEFAULT_ABAC_DB, rbac_db=DEFAULT_RBAC_DB, attempts=10_000, seed=None):
+    """Access requests from simulated phishing and token-theft campaigns against both environments.
+
+    Victims and outcomes are drawn like the environments' batched campaigns (each with
+    `attempts` attempts) and the requests of all four campaigns are interleaved at random.
+    """
+    rng = np.random.default_rng(seed)
+    requests = []
+
+    abac_users = abac_simulation.UserColumns(abac_db)
+    for vector, odds, default in (("phishing", abac_simulation.PHISHING_SUCCESS_PROB,
+                                   abac_simulation.PHISHING_DEFAULT_PROB),
+                                  ("token_theft", abac_simulation.TOKEN_THEFT_PROB,
+                                   abac_simulation.TOKEN_THEFT_DEFAULT_PROB)):
+        _, compromised = abac_simulation.simulate_campaign_batch(abac_users, attempts, odds, default, rng)
+        requests += campaign_requests("abac", lambda i: abac_users[i]["username"], compromised, vector)
+    abac_users.conn.close()
+
+    rbac_users = rbac_simulation.UserColumns(rbac_db)
+    for vector, odds in (("phishing", rbac_simulation.PHISHING_SUCCESS_PROB),
+                         ("token_theft", rbac_simulation.TOKEN_THEFT_PROB)):
+        _, compromised = rbac_simulation.compromise_accounts_batch(rbac_users, attempts, odds, rng)
+        requests += campaign_requests("rbac", lambda i: rbac_users[i]["username"], compromised, vector)
+    rbac_users.conn.close()
+
+    return [requests[i] for i in rng.permutation(len(requests))]
+
+
+async def _open(socket_path, port):
+    if port is not None:
+        return await asyncio.open_connection("127.0.0.1", port)
+    return await asyncio.open_unix_connection(socket_path)
+
+
+async def replay(requests, socket_path=DEFAULT_SOCKET, port=None, connections=8, window=64):
+    """Send `requests` over `connections` connections, keeping up to `window` unanswered on each.
+
+    Returns (latencies in seconds, responses, wall time), indexed like `requests`.
+    """
+    latencies = np.zeros(len(requests))
+    responses = [None] * len(requests)
+
+    async def client(indices):
+        reader, writer = await _open(socket_path, port)
+        in_flight = asyncio.Semaphore(window)
+        sent_at = {}
+
+        async def receive():
+            for _ in indices:
+                response = json.loads(await reader.readline())
+                index = response["id"]
+                latencies[index] = time.perf_counter() - sent_at.pop(index)
+                responses[index] = response
+                in_flight.release()
+
+        receiver = asyncio.create_task(receive())
+        for index in indices:
+            await in_flight.acquire()
+            request = requests[index]
+            sent_at[index] = time.perf_counter()
+            writer.write(json.dumps({"id": index, "engine": request["engine"], "username": request["username"],
+                                     "resource": request["resource"]}).encode() + b"\n")
+        await writer.drain()
+        await receiver
+        writer.close()
+        await writer.wait_closed()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(range(k, len(requests), connections)) for k in range(connections)))
+    return latencies, responses, time.perf_counter() - start
+
+
+def summarize(requests, latencies, responses, wall_time):
+    """Overall and per (engine, vector) request counts, p50/p99 latency (ms), allow rate and errors."""
+    groups = {"all": np.arange(len(requests))}
+    for key in sorted({(r["engine"], r["vector"]) for r in requests}):
+        groups[f"{key[0]}.{key[1]}"] = np.array([i for i, r in enumerate(requests)
+                                                 if (r["engine"], r["vector"]) == key])
+    allowed = np.array([bool(r and r.get("allow")) for r in responses])
+    errors = np.array([r is None or "error" in r for r in responses])
+    summary = {"requests_per_s": len(requests) / wall_time, "wall_time_s": wall_time, "groups": {}}
+    for name, index in groups.items():
+        summary["groups"][name] = {
+            "requests": int(len(index)),
+            "p50_ms": float(np.percentile(latencies[index], 50) * 1000) if len(index) else 0.0,
+            "p99_ms": float(np.percentile(latencies[index], 99) * 1000) if len(index) else 0.0,
+            "allow_rate": float(allowed[index].mean()) if len(index) else 0.0,
+            "errors": int(errors[index].sum()),
+        }
+    return summary
+
+
+def print_summary(summary):
+    print(f"\nThroughput: {summary['requests_per_s']:,.0f} requests/s ({summary['wall_time_s']:.2f} s)")
+    print(f"{'Traffic':<20}{'Requests':>10}{'p50 (ms)':>10}{'p99 (ms)':>10}{'Allowed':>9}{'Errors':>8}")
+    for name, group in summary["groups"].items():
+        print(f"{name:<20}{group['requests']:>10,}{group['p50_ms']:>10.2f}{group['p99_ms']:>10.2f}"
+              f"{group['allow_rate']:>9.1%}{group['errors']:>8}")
+
+
+def spawn_service(socket_path, abac_db, rbac_db, extra_args=(), timeout=30.0):
+    """Start decision_service.py in a subprocess and wait until its socket accepts connections."""
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    process = subprocess.Popen([sys.executable, os.path.join(REPO_DIR, "decision_service.py"), "--socket",
+                                socket_path, "--abac-db", abac_db, "--rbac-db", rbac_db, *extra_args])
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(socket_path):
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.kill()
+            raise RuntimeError("Decision service did not start.")
+        time.sleep(0.05)
+    return process
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay simulated attack traffic against the decision service.")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="Unix socket of the service")
+    parser.add_argument("--port", type=int, help="connect to 127.0.0.1:PORT instead of a Unix socket")
+    parser.add_argument("--abac-db", default=DEFAULT_ABAC_DB, help="ABAC users database")
+    parser.add_argument("--rbac-db", default=DEFAULT_RBAC_DB, help="RBAC users database")
+    parser.add_argument("--attempts", type=int, default=10_000, help="attempts per simulated campaign")
+    parser.add_argument("--connections", type=int, default=8, help="concurrent client connections")
+    parser.add_argument("--window", type=int, default=64, help="unanswered requests allowed per connection")
+    parser.add_argument("--seed", type=int, help="seed of the simulated campaigns")
+    parser.add_argument("--spawn", action="store_true", help="start decision_service.py for the duration of the run")
+    parser.add_argument("--output", help="write the summary to this JSON file")
+    args = parser.parse_args(argv)
+
+    requests = build_traffic(args.abac_db, args.rbac_db, args.attempts, args.seed)
+    print(f"Replaying {len(requests):,} requests from {4 * args.attempts:,} simulated attack attempts")
+
+    process = spawn_service(args.socket, args.abac_db, args.rbac_db) if args.spawn else None
+    try:
+        latencies, responses, wall_time = asyncio.run(
+            replay(requests, args.socket, args.port, args.connections, args.window))
+    finally:
+        if process is not None:
+            process.send_signal(signal.SIGINT)
+            process.wait()
+
+    summary = summarize(requests, latencies, responses, wall_time)
+    print_summary(summary)
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(summary, handle, indent=2)
+        print(f"\nSummary written to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import numpy as np
+
+from attack_rates import ABAC_SUCCESS_RATES, RBAC_SUCCESS_RATES
+from batch_engine import RECORD_COLUMNS, ScenarioBatch
+
+# Exact steps past the damping horizon before the trajectory is extrapolated from its steady state.
+SETTLE_STEPS = 1000
+
+
+def expected_breach_prob(rbac_share, attacker_strategy):
+    """Expected per-attempt breach probability of AttackerAgent.execute_attack at a given RBAC share."""
+    rbac_share = np.asarray(rbac_share, dtype=float)
+    return sum(p * p * (rbac * rbac_share + abac * (1 - rbac_share))
+               for p, rbac, abac in zip(attacker_strategy, RBAC_SUCCESS_RATES, ABAC_SUCCESS_RATES))
+
+
+def mean_field_trajectory(steps, initial_policy_mix=(0.5, 0.5), attacker_strategy=(0.5, 0.5), num_attackers=50,
+                          K_s=0.15, K_u=0.15, damping_factor=0.7, damping_horizon=50, moving_window=10,
+                          target_abac_share=0.5, noise=False, rng=None, settle_steps=SETTLE_STEPS):
+    """Expected trajectory of hybrid.AccessControlModel, returned as RECORD_COLUMNS arrays of length `steps`.
+
+    The defender's control law is iterated on expected values: with its activation slot
+    uniform among the attackers, the expected breach probability of a step is the mean of
+    expected_breach_prob before and after the defender's update. The breach rate is a
+    breach count over attempts, so the result does not depend on num_attackers.
+
+    The first `settle_steps` steps past damping_horizon run as an exact scalar loop. By
+    then the policy share tracks the breach rate and the rest of the run is its steady
+    state: either the share stays clipped at 0 or 1 (solved in closed form), or the
+    deviation of the cumulative breach rate from its fixed point decays as a product of
+    (i + g) / (i + 1) factors, refined by one exact pass of the control law. This agrees
+    with the step-by-step recursion to about 1e-9; if the tail would leave [0, 1] or has
+    no stable fixed point, the loop finishes the run instead.
+
+    With noise=True the expected breach counts are replaced by binomial draws per step,
+    which is a one-scenario batch_engine.ScenarioBatch.
+    """
+    if noise:
+        batch = ScenarioBatch(rbac_share=initial_policy_mix[0], phishing_prob=attacker_strategy[0],
+                              num_attackers=num_attackers, K_s=K_s, K_u=K_u, damping_factor=damping_factor,
+                              damping_horizon=damping_horizon, moving_window=moving_window, rng=rng)
+        batch.target_abac_share[:] = target_abac_share
+        return {name: column[:, 0] for name, column in batch.run(steps).items()}
+
+    target_breach_rate = 0.0
+    # expected_breach_prob is linear in the RBAC share: base + slope * share.
+    base = float(expected_breach_prob(0.0, attacker_strategy))
+    slope = float(expected_breach_prob(1.0, attacker_strategy)) - base
+    rbac = np.empty(steps + 1)
+    rates = np.empty(steps)
+    breach_ma = np.empty(steps)
+    rbac[0] = initial_policy_mix[0]
+
+    def run_loop(start, stop, cumulative_breach):
+        x = float(rbac[start])
+        window = [float(rate) for rate in rates[max(0, start - moving_window + 1):start]]
+        window_sum = sum(window)
+        for i in range(start, stop):
+            rate = cumulative_breach / i if i else 0.0
+            window.append(rate)
+            window_sum += rate
+            if len(window) > moving_window:
+                window_sum -= window.pop(0)
+            moving = window_sum / len(window)
+            rates[i] = rate
+            breach_ma[i] = moving
+            history_length = i + 1
+            if history_length >= 3:
+                delta_rbac = K_s * (moving - target_breach_rate) - K_u * (target_abac_share - (1 - x))
+                adaptive_damping = damping_factor * (1 - min(1.0, history_length / damping_horizon))
+                new_x = x * adaptive_damping + (x + delta_rbac) * (1 - adaptive_damping)
+                new_x = max(0.0, min(new_x, 1.0))
+            else:
+                new_x = x
+            cumulative_breach += base + slope * (x + new_x) / 2
+            x = new_x
+            rbac[i + 1] = x
+        return cumulative_breach
+
+    # Past damping_horizon the damping is zero and the defender updates every step.
+    tail_start = min(steps, max(2, int(np.ceil(damping_horizon)) - 1) + settle_steps)
+    cumulative_breach = run_loop(0, tail_start, 0.0)
+    if tail_start == steps:
+        return _records(rbac[:steps], breach_ma)
+
+    from scipy.signal import lfilter
+
+    # Undamped, x[i + 1] = alpha * x[i] + K_s * breach_ma[i] + offset until clipped.
+    alpha = 1 - K_u
+    offset = K_u * (1 - target_abac_share) - K_s * target_breach_rate
+    i = np.arange(tail_start, steps, dtype=float)
+    lead = rates[max(0, tail_start - moving_window + 1):tail_start]
+    window_counts = np.minimum(i + 1, moving_window)
+
+    def moving_average(tail_rates):
+        summed = np.cumsum(np.concatenate([lead, tail_rates]))
+        summed[moving_window:] -= summed[:-moving_window]
+        return summed[len(lead):] / window_counts
+
+    def breach_rates(x):
+        step_breach = base + slope * (x[:-1] + x[1:]) / 2
+        cumulative = np.cumsum(step_breach)
+        cumulative -= step_breach
+        cumulative += cumulative_breach
+        return cumulative / i
+
+    x = np.full(len(i) + 1, rbac[tail_start])
+    tail_ma = None
+    if x[0] in (0.0, 1.0):
+        # Clipped share: the breach probability per step is constant, and the share stays
+        # clipped while the unclipped update keeps pointing past the bound.
+        tail_ma = moving_average(breach_rates(x))
+        unclipped = alpha * x[0] + K_s * tail_ma + offset
+        if not (np.all(unclipped >= 1.0) if x[0] == 1.0 else np.all(unclipped <= 0.0)):
+            tail_ma = None
+
+    denominator = K_u - K_s * slope
+    if tail_ma is None and 0 < K_u < 2 and denominator > 0:
+        # Fixed point x* = alpha * x* + K_s * rate* + offset with rate* = base + slope * x*.
+        # Near it each step scales the rate's deviation by (i + g) / (i + 1), g = slope * K_s / K_u.
+        steady_rate = base + slope * (K_s * base + offset) / denominator
+        g = slope * K_s / K_u
+        deviation = np.empty(len(i))
+        deviation[0] = 1.0
+        np.cumprod((i[:-1] + g) / (i[:-1] + 1), out=deviation[1:])
+        deviation *= cumulative_breach / tail_start - steady_rate
+        tail_ma = moving_average(steady_rate + deviation)
+        # One exact pass of the control law: shares from the extrapolated rates, rates from those shares.
+        x[1:], _ = lfilter([1.0], [1.0, -alpha], K_s * tail_ma + offset, zi=[alpha * x[0]])
+        tail_ma = moving_average(breach_rates(x))
+        x[1:], _ = lfilter([1.0], [1.0, -alpha], K_s * tail_ma + offset, zi=[alpha * x[0]])
+        if not np.all((x >= 0) & (x <= 1)):
+            tail_ma = None
+
+    if tail_ma is None:
+        run_loop(tail_start, steps, cumulative_breach)
+    else:
+        rbac[tail_start:] = x
+        breach_ma[tail_start:] = tail_ma
+    return _records(rbac[:steps], breach_ma)
+
+
+def _records(rbac_share, breach_ma):
+    return dict(zip(RECORD_COLUMNS, (rbac_share, 1 - rbac_share, breach_ma)))
+
+
+if __name__ == "__main__":
+    import time
+
+    from hybrid import run_game_theory_analysis
+
+    defender_strategy, attacker_strategy = run_game_theory_analysis()
+
+    start = time.perf_counter()
+    trajectory = mean_field_trajectory(1_000_000, defender_strategy, attacker_strategy)
+    elapsed = time.perf_counter() - start
+    print(f"\n10^6-step mean-field trajectory in {elapsed * 1000:.1f} ms: "
+          f"RBAC share {trajectory['RBAC Policy'][-1]:.4f}, breach rate {trajectory['Breach Rate'][-1]:.4f}")
+
+    steps = 200
+    expected = mean_field_trajectory(steps, defender_strategy, attacker_strategy)
+    print("\nReplications  max |mean - mean field| (RBAC share, breach rate)")
+    for replications in (10, 100, 1000, 10000):
+        batch = ScenarioBatch(rbac_share=np.full(replications, defender_strategy[0]),
+                              phishing_prob=attacker_strategy[0], rng=np.random.default_rng(replications))
+        records = batch.run(steps)
+        print(f"{replications:>12}  "
+              f"{np.max(np.abs(records['RBAC Policy'].mean(axis=1) - expected['RBAC Policy'])):.5f}  "
+              f"{np.max(np.abs(records['Breach Rate'].mean(axis=1) - expected['Breach Rate'])):.5f}")
@@ -0,0 +1,295 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+ENV_DIRS = [os.path.join(REPO_DIR, "ABAC_env"), os.path.join(REPO_DIR, "RBAC_env")]
+REGRESSION_THRESHOLD = 0.10
+STARTUP_MODULES = ["hybrid", "pure_abac", "pure_rbac", "comparision", "solvers", "batch_engine", "mean_field"]
+# Cold-start budget in seconds per module, interpreter start included. Mesa (with pandas and
+# networkx) takes about half a second on its own; the NumPy-only modules should stay near NumPy.
+STARTUP_BUDGETS = {"hybrid": 1.0, "pure_abac": 1.0, "pure_rbac": 1.0, "comparision": 1.0, "solvers": 0.3,
+                   "batch_engine": 0.3, "mean_field": 0.3}
+# Loaded on first use only, so that headless workers never pay for them.
+LAZY_DEPENDENCIES = ["matplotlib", "nashpy", "scipy"]
+
+
+def measure(func, repeat=5, number=1):
+    """Best per-call wall time in seconds over `repeat` timed runs of `number` calls each.
+
+    One untimed call first absorbs lazy imports and cold caches. As with timeit, the
+    minimum is reported because slower runs reflect interference, not the code.
+    """
+    func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        times.append((time.perf_counter() - start) / number)
+    return min(times)
+
+
+def result(value, unit, higher_is_better=True):
+    return {"value": float(value), "unit": unit, "higher_is_better": higher_is_better}
+
+
+def bench_step_throughput(attacker_counts, steps=5, agent_max=1000):
+    """AccessControlModel.step rate as the number of attackers grows, vectorized and (up to agent_max) agent-based."""
+    from hybrid import AccessControlModel
+    results = {}
+    for num_attackers in attacker_counts:
+        modes = [True, False] if num_attackers <= agent_max else [True]
+        for vectorized in modes:
+            model = AccessControlModel(num_attackers=num_attackers, initial_policy_mix=(0.6, 0.4),
+                                       attacker_strategy=(0.3, 0.7), vectorized=vectorized, rng=0)
+            for _ in range(3):
+                model.step()
+            seconds = measure(model.step, repeat=3, number=steps)
+            name = f"step.{'vectorized' if vectorized else 'agents'}.{num_attackers}"
+            results[name + ".steps_per_s"] = result(1 / seconds, "steps/s")
+            results[name + ".attacks_per_s"] = result(num_attackers / seconds, "attacks/s")
+    return results
+
+
+def bench_solver_latency(sizes, seed=0):
+    """solve_game latency on random square games of each size, with the method picked automatically."""
+    from solvers import choose_method, solve_game
+    rng = np.random.default_rng(seed)
+    results = {}
+    for size in sizes:
+        defender_payoffs = rng.uniform(-5, 5, (size, size))
+        attacker_payoffs = rng.uniform(-5, 5, (size, size))
+        method = choose_method(defender_payoffs, attacker_payoffs)
+        seconds = measure(lambda: solve_game(defender_payoffs, attacker_payoffs), repeat=3)
+        results[f"solver.{size}x{size}.{method}.latency"] = result(seconds * 1000, "ms", higher_is_better=False)
+    return results
+
+
+def bench_access_checks(decisions=100_000, seed=0):
+    """ABAC and RBAC access decisions per second (detection disabled for RBAC, to time the decision path)."""
+    sys.path[:0] = [path for path in ENV_DIRS if path not in sys.path]
+    import contextlib
+    import io
+
+    import abac
+    import rbac
+    import rbac_simulation
+
+    rng = np.random.default_rng(seed)
+    resources = list(abac.resources)
+    roles = ["Admin", "Engineer", "Staff"]
+    departments = ["Administration", "Engineering", "Support", "HR", "Logistics"]
+    users = [{"username": f"user{i}", "role": roles[r], "department": departments[d], "clearance": int(c),
+              "compromised": False}
+             for i, (r, d, c) in enumerate(zip(rng.integers(3, size=1000), rng.integers(5, size=1000),
+                                               rng.integers(1, 6, size=1000)))]
+    requests = [(users[u], resources[r])
+                for u, r in zip(rng.integers(len(users), size=decisions), rng.integers(len(resources), size=decisions))]
+
+    def run(check):
+        def loop():
+            for user, resource in requests:
+                check(user, resource)
+        return decisions / measure(loop, repeat=3)
+
+    results = {
+        "access.abac.check_access.decisions_per_s": result(run(abac.check_access), "decisions/s"),
+        "access.abac.check_access_cached.decisions_per_s": result(run(abac.check_access_cached), "decisions/s"),
+    }
+    columns = abac.users_to_columns([user for user, _ in requests])
+    policy = abac.CompiledPolicy()
+    seconds = measure(lambda: policy.evaluate(columns), repeat=3)
+    results["access.abac.compiled_matrix.decisions_per_s"] = result(decisions * len(resources) / seconds,
+                                                                    "decisions/s")
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "rbac.db")
+        with contextlib.redirect_stdout(io.StringIO()):
+            rbac.populate(db_path, population=1000, seed=seed)
+        store = rbac_simulation.RevocationStore(db_path)
+        try:
+            results["access.rbac.check_rbac_access.decisions_per_s"] = result(
+                run(lambda user, resource: rbac_simulation.check_rbac_access(user, resource, 0.0, store, rng=rng)),
+                "decisions/s")
+        finally:
+            store.close()
+    return results
+
+
+def bench_sqlite(population=100_000, flags=20_000, seed=0):
+    """Bulk user loading for both environments and write-behind flagging of compromised RBAC users."""
+    sys.path[:0] = [path for path in ENV_DIRS if path not in sys.path]
+    import contextlib
+    import io
+
+    import rbac
+    import rbac_simulation
+    import seed_users
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory, contextlib.redirect_stdout(io.StringIO()):
+        abac_db = os.path.join(directory, "abac.db")
+        load = seed_users.seed_database(abac_db, population=population, seed=seed)
+        results["sqlite.abac.load.rows_per_s"] = result(load["rows_per_second"], "rows/s")
+
+        rbac_db = os.path.join(directory, "rbac.db")
+        load = rbac.populate(rbac_db, population=population, seed=seed)
+        results["sqlite.rbac.load.rows_per_s"] = result(load["rows_per_second"], "rows/s")
+
+        usernames = [f"user{n:02d}" for n in np.random.default_rng(seed).integers(1, population + 1, size=flags)]
+        store = rbac_simulation.RevocationStore(rbac_db)
+        start = time.perf_counter()
+        for username in usernames:
+            store.flag(username)
+        store.close()
+        results["sqlite.rbac.flag.flags_per_s"] = result(flags / (time.perf_counter() - start), "flags/s")
+    return results
+
+
+def bench_startup(modules=STARTUP_MODULES, repeat=3):
+    """Wall time of a fresh interpreter importing each module (interpreter start included)."""
+    results = {}
+    for module in modules:
+        def start():
+            subprocess.run([sys.executable, "-c", f"import {module}"], cwd=REPO_DIR, check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        results[f"startup.import_{module}.seconds"] = result(measure(start, repeat=repeat), "s",
+                                                            higher_is_better=False)
+    return results
+
+
+def eager_imports(module, dependencies=LAZY_DEPENDENCIES):
+    """Which of `dependencies` a fresh interpreter has loaded after importing `module`."""
+    code = f"import sys, {module}; print(' '.join(d for d in {dependencies!r} if d in sys.modules))"
+    output = subprocess.run([sys.executable, "-c", code], cwd=REPO_DIR, check=True, capture_output=True,
+                            text=True).stdout
+    return output.split()
+
+
+def startup_violations(report, budgets=STARTUP_BUDGETS):
+    """Modules over their cold-start budget or importing a lazy dependency eagerly, as messages."""
+    violations = []
+    for module, budget in budgets.items():
+        entry = report["results"].get(f"startup.import_{module}.seconds")
+        if entry is not None and entry["value"] > budget:
+            violations.append(f"import {module} took {entry['value']:.3f} s (budget {budget:.2f} s)")
+        eager = eager_imports(module)
+        if eager:
+            violations.append(f"import {module} loads {', '.join(eager)} eagerly")
+    return violations
+
+
+def run_suite(quick=False):
+    """Run every benchmark and return {"meta": ..., "results": {name: {value, unit, higher_is_better}}}."""
+    attacker_counts = [10, 100, 1000, 10_000] if quick else [10, 100, 1000, 10_000, 100_000, 1_000_000]
+    sizes = [2, 4, 6, 8] if quick else [2, 3, 4, 5, 6, 8, 10, 15, 20]
+    sections = [
+        ("step throughput", lambda: bench_step_throughput(attacker_counts, agent_max=100 if quick else 1000)),
+        ("solver latency", lambda: bench_solver_latency(sizes)),
+        ("access checks", lambda: bench_access_checks(20_000 if quick else 100_000)),
+        ("sqlite", lambda: bench_sqlite(20_000 if quick else 100_000, 5_000 if quick else 20_000)),
+        ("startup", lambda: bench_startup(repeat=1 if quick else 3)),
+    ]
+    results = {}
+    for label, bench in sections:
+        print(f"Running {label} benchmarks...")
+        results.update(bench())
+    return {"meta": environment_info(quick), "results": results}
+
+
+def environment_info(quick):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True,
+                                text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "quick": quick,
+    }
+
+
+def compare(current, baseline, threshold=REGRESSION_THRESHOLD):
+    """Rows (name, baseline, current, relative change, regressed) for benchmarks present in both runs.
+
+    The relative change is signed so that positive means better; a benchmark regresses when
+    it got worse by more than `threshold`. Only compare runs from the same machine.
+    """
+    rows = []
+    for name, entry in current["results"].items():
+        if name not in baseline["results"]:
+            continue
+        before = baseline["results"][name]["value"]
+        after = entry["value"]
+        change = (after - before) / before if before else 0.0
+        if not entry["higher_is_better"]:
+            change = -change
+        rows.append((name, before, after, change, change < -threshold))
+    return rows
+
+
+def print_results(report):
+    for name, entry in report["results"].items():
+        print(f"  {name:<55} {entry['value']:>14,.3f} {entry['unit']}")
+
+
+def print_comparison(rows):
+    for name, before, after, change, regressed in rows:
+        flag = "REGRESSION" if regressed else ""
+        print(f"  {name:<55} {before:>14,.3f} -> {after:>14,.3f} ({change:+.1%}) {flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Performance benchmarks for the simulations and environments.")
+    parser.add_argument("--output", default="perf_results.json", help="where to write the JSON results")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="relative slowdown that counts as a regression (default 0.10)")
+    parser.add_argument("--quick", action="store_true", help="smaller sizes, for a fast smoke run")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+
+    report = run_suite(args.quick)
+    with open(args.output, "w") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"\nResults written to: {args.output}")
+    print_results(report)
+
+    status = 0
+    violations = startup_violations(report)
+    if violations:
+        print("\nStartup budget violations:")
+        for message in violations:
+            print(f"  {message}")
+        status = 1
+
+    if baseline is not None:
+        rows = compare(report, baseline, args.threshold)
+        print(f"\nComparison with {args.baseline} (regression threshold {args.threshold:.0%}):")
+        print_comparison(rows)
+        regressions = [row for row in rows if row[4]]
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) found.")
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
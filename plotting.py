@@ -0,0 +1,156 @@
+import argparse
+
+import numpy as np
+
+from recorder import load_columns
+
+# Below this many points a series is drawn as is.
+MIN_PIXEL_WIDTH = 100
+
+
+def minmax_indices(y, buckets, chunk=1 << 20):
+    """Indices of the minimum and maximum of `y` in each of about `buckets` equal buckets, in order.
+
+    Keeping both extremes of every pixel-wide bucket draws the same envelope as the full
+    series, spikes included. The first and last points are always kept. `y` is read
+    `chunk` values at a time, so a memory-mapped column is never loaded as a whole.
+    """
+    n = len(y)
+    if n <= 2 * buckets:
+        return np.arange(n)
+    size = -(-n // buckets)
+    full = n // size
+    per_chunk = max(1, chunk // size)
+    parts = [np.array([0, n - 1])]
+    for first in range(0, full, per_chunk):
+        last = min(full, first + per_chunk)
+        block = np.asarray(y[first * size:last * size]).reshape(-1, size)
+        offsets = np.arange(first, last) * size
+        parts.append(block.argmin(axis=1) + offsets)
+        parts.append(block.argmax(axis=1) + offsets)
+    if full * size < n:
+        tail = np.asarray(y[full * size:])
+        parts.append(np.array([tail.argmin(), tail.argmax()]) + full * size)
+    return np.unique(np.concatenate(parts))
+
+
+def lttb_indices(y, points, x=None):
+    """Indices of `points` values of `y` chosen by Largest-Triangle-Three-Buckets.
+
+    The first and last points are kept; every bucket in between contributes the point
+    forming the largest triangle with the previously chosen point and the mean of the
+    next bucket, which preserves the visual shape of the line. `x` defaults to the
+    positions 0..n-1. Buckets are read one at a time, so memory-mapped input works.
+    """
+    n = len(y)
+    if points >= n or points < 3:
+        return np.arange(n)
+    # Buckets k = 0..points-3 split [1, n-1); the last point forms the final bucket.
+    bounds = np.append(np.linspace(1, n - 1, points - 1).astype(np.intp), n)
+    counts = np.diff(bounds)
+    mean_y = np.add.reduceat(y, bounds[:-1], dtype=float) / counts
+    if x is None:
+        mean_x = (bounds[:-1] + bounds[1:] - 1) / 2
+    else:
+        mean_x = np.add.reduceat(x, bounds[:-1], dtype=float) / counts
+
+    indices = np.empty(points, dtype=np.intp)
+    indices[0], indices[-1] = 0, n - 1
+    chosen = 0
+    for k in range(points - 2):
+        start, end = bounds[k], bounds[k + 1]
+        bucket_y = np.asarray(y[start:end], dtype=float)
+        if x is None:
+            bucket_x = np.arange(start, end, dtype=float)
+            chosen_x = float(chosen)
+        else:
+            bucket_x = np.asarray(x[start:end], dtype=float)
+            chosen_x = float(x[chosen])
+        chosen_y = float(y[chosen])
+        area = np.abs((chosen_x - mean_x[k + 1]) * (bucket_y - chosen_y)
+                      - (chosen_x - bucket_x) * (mean_y[k + 1] - chosen_y))
+        chosen = start + int(area.argmax())
+        indices[k + 1] = chosen
+    return indices
+
+
+def downsample_indices(y, points, method="minmax", x=None):
+    if method == "minmax":
+        return minmax_indices(y, max(1, points // 2))
+    if method == "lttb":
+        return lttb_indices(y, points, x)
+    raise ValueError(f"Unknown downsampling method '{method}'. Use 'minmax' or 'lttb'.")
+
+
+def pixel_width(ax):
+    """Width of the axes in output pixels, at the figure's dpi."""
+    return max(MIN_PIXEL_WIDTH, int(ax.get_window_extent().width))
+
+
+def _positions(indices, x, every):
+    return indices * every if x is None else np.asarray(x[indices])
+
+
+def plot_series(ax, y, x=None, every=1, max_points=None, method="minmax", **kwargs):
+    """ax.plot of `y` downsampled to about two points per pixel of the axes' width.
+
+    `y` may be a pandas Series (its index is the x axis), an array or a memory-mapped
+    column. Without `x`, point i is drawn at step i * every, matching ColumnRecorder.
+    """
+    if x is None and hasattr(y, "index"):
+        x = y.index.to_numpy()
+        y = y.to_numpy()
+    points = max_points or 2 * pixel_width(ax)
+    indices = downsample_indices(y, points, method, x)
+    return ax.plot(_positions(indices, x, every), np.asarray(y[indices]), **kwargs)
+
+
+def plot_band(ax, lower, upper, x=None, every=1, max_points=None, **kwargs):
+    """ax.fill_between over the per-bucket envelope (min of `lower`, max of `upper`) of a band."""
+    lower, upper = np.asarray(lower), np.asarray(upper)
+    n = len(lower)
+    buckets = max_points or pixel_width(ax)
+    if n <= buckets:
+        starts = np.arange(n)
+        low, high = lower, upper
+    else:
+        starts = np.unique(np.append(np.linspace(0, n, buckets, endpoint=False).astype(np.intp), n - 1))
+        low = np.minimum.reduceat(lower, starts)
+        high = np.maximum.reduceat(upper, starts)
+    return ax.fill_between(_positions(starts, x, every), low, high, **kwargs)
+
+
+def plot_recording(directory, output_path, names=None, method="minmax"):
+    """Plot columns of a recording saved with ColumnRecorder.save_columns, one panel each, from disk."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    columns, every, attrs = load_columns(directory)
+    names = names or list(columns)
+    fig, axes = plt.subplots(len(names), 1, figsize=(12, 4 * len(names)), squeeze=False)
+    for ax, name in zip(axes[:, 0], names):
+        plot_series(ax, columns[name], every=every, method=method, label=name)
+        ax.set_title(name)
+        ax.set_ylabel(name)
+        ax.grid(True, linestyle='--', alpha=0.7)
+        ax.legend()
+    axes[-1, 0].set_xlabel("Simulation Steps")
+    fig.tight_layout()
+    fig.savefig(output_path)
+    plt.close(fig)
+    print(f"Visualization saved to: {output_path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Plot a recording saved with ColumnRecorder.save_columns.")
+    parser.add_argument("directory", help="directory holding the .npy columns")
+    parser.add_argument("--output", default="recording.png", help="where to write the PNG")
+    parser.add_argument("--columns", nargs="+", help="columns to plot (default: all)")
+    parser.add_argument("--method", choices=["minmax", "lttb"], default="minmax", help="downsampling method")
+    args = parser.parse_args(argv)
+    plot_recording(args.directory, args.output, args.columns, args.method)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import contextlib
+import json
+import time
+
+_NULL_PHASE = contextlib.nullcontext()
+
+
+class _Phase:
+    """Reusable timer context for one named phase; nested entries of the same phase are allowed."""
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self._starts = []
+
+    def __enter__(self):
+        self._starts.append(time.perf_counter())
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self._starts.pop()
+        self.profiler.totals[self.name] += elapsed
+        self.profiler.calls[self.name] += 1
+
+
+class Profiler:
+    """Named phase timers and counters for the simulation loops.
+
+    Call sites wrap each phase in `with profiler.phase(name):` and bump counters with
+    profiler.count(name). A disabled profiler hands out one shared null context and
+    ignores counts, so instrumented code runs at near-zero cost by default
+    (NULL_PROFILER). Phase times are inclusive: a phase nested in another is counted
+    in both.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.totals = {}
+        self.calls = {}
+        self.counters = {}
+        self._phases = {}
+
+    def phase(self, name):
+        if not self.enabled:
+            return _NULL_PHASE
+        timer = self._phases.get(name)
+        if timer is None:
+            timer = self._phases[name] = _Phase(self, name)
+            self.totals[name] = 0.0
+            self.calls[name] = 0
+        return timer
+
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def reset(self):
+        for name in self.totals:
+            self.totals[name] = 0.0
+            self.calls[name] = 0
+        self.counters.clear()
+
+    def summary(self):
+        """Per-phase rows {phase, calls, total_s, mean_us, share}, slowest first, and the counters."""
+        grand_total = sum(self.totals.values()) or 1.0
+        phases = [{"phase": name,
+                   "calls": self.calls[name],
+                   "total_s": total,
+                   "mean_us": total / self.calls[name] * 1e6 if self.calls[name] else 0.0,
+                   "share": total / grand_total}
+                  for name, total in sorted(self.totals.items(), key=lambda item: -item[1])]
+        return {"phases": phases, "counters": dict(self.counters)}
+
+    def format_table(self):
+        summary = self.summary()
+        lines = [f"{'Phase':<24}{'Calls':>12}{'Total (s)':>12}{'Mean (us)':>12}{'Share':>8}"]
+        for row in summary["phases"]:
+            lines.append(f"{row['phase']:<24}{row['calls']:>12,}{row['total_s']:>12.4f}"
+                         f"{row['mean_us']:>12.2f}{row['share']:>8.1%}")
+        for name, value in summary["counters"].items():
+            lines.append(f"{name:<24}{value:>12,}")
+        return "\n".join(lines)
+
+    def export(self, path):
+        """Write the summary to a JSON profile file."""
+        with open(path, "w") as handle:
+            json.dump(self.summary(), handle, indent=2)
+
+
+NULL_PROFILER = Profiler(enabled=False)
@@ -1,24 +1,30 @@
 import numpy as np
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
 from mesa import Model, Agent
 from mesa.time import RandomActivation
-from mesa.datacollection import DataCollector
+from attack_rates import ATTACK_STRATEGIES
+from recorder import ColumnRecorder
+from streaming_stats import RollingStats
+from plotting import plot_series
+from profiling import NULL_PROFILER
+from tracing import NULL_TRACER, STEP, Tracer
 
 
 class PureRBACModel(Model):
     """Mesa model for pure RBAC simulation."""
-    def __init__(self, num_employees=50, num_attackers=10, attacker_strategy=None):
+    def __init__(self, num_employees=50, num_attackers=10, attacker_strategy=None, horizon=None, record_every=1, rng=None,
+                 profiler=NULL_PROFILER):
         super().__init__()
+        self.rng = np.random.default_rng(rng)
+        self.reset_randomizer(int(self.rng.integers(2**63)))
         self.schedule = RandomActivation(self)
         self.num_employees = num_employees
         self.num_attackers = num_attackers
         self.policy = "RBAC"
         self.breach_count = 0
         self.access_attempts = 0
-        self.breach_rates_history = []
         self.moving_window = 10
+        self.breach_stats = RollingStats(self.moving_window)
+        self.profiler = profiler
 
         self.attacker_strategy = attacker_strategy or [0.5, 0.5]
 
@@ -31,12 +37,8 @@ class PureRBACModel(Model):
         self.defender = DefenderAgent(defender_id, self)
         self.schedule.add(self.defender)
 
-        self.datacollector = DataCollector(
-            model_reporters={
-                "Policy": lambda m: m.policy,
-                "Breach Rate": lambda m: m.get_moving_breach_rate()
-            }
-        )
+        self.datacollector = ColumnRecorder({"Breach Rate": np.float64}, horizon=horizon, every=record_every,
+                                            attrs={"Policy": self.policy})
 
     def get_current_breach_rate(self):
         if self.access_attempts == 0:
@@ -44,15 +46,19 @@ class PureRBACModel(Model):
         return self.breach_count / self.access_attempts
 
     def get_moving_breach_rate(self):
-        if len(self.breach_rates_history) == 0:
-            return 0
-        return np.mean(self.breach_rates_history[-self.moving_window:])
+        return self.breach_stats.mean()
 
     def step(self):
-        current_rate = self.get_current_breach_rate()
-        self.breach_rates_history.append(current_rate)
-        self.datacollector.collect(self)
+        profiler = self.profiler
+        with profiler.phase("breach_stats"):
+            current_rate = self.get_current_breach_rate()
+            self.breach_stats.push(current_rate)
+        with profiler.phase("moving_breach_rate"):
+            breach_rate_ma = self.get_moving_breach_rate()
+        with profiler.phase("record"):
+            self.datacollector.record(breach_rate_ma)
         self.schedule.step()
+        profiler.count("steps")
 
 
 class AttackerAgent(Agent):
@@ -62,18 +68,20 @@ class AttackerAgent(Agent):
         self.attack_strategy = "phishing"
 
     def step(self):
-        self.attack_strategy = np.random.choice(["phishing", "token_theft"], p=self.strategy_probs)
-        self.model.access_attempts += 1
+        with self.model.profiler.phase("attackers"):
+            self.attack_strategy = ATTACK_STRATEGIES[self.model.rng.choice(2, p=self.strategy_probs)]
+            self.model.access_attempts += 1
 
-        if self.execute_attack():
-            self.model.breach_count += 1
+            if self.execute_attack():
+                self.model.breach_count += 1
+        self.model.profiler.count("attacks")
 
     def execute_attack(self):
         if self.attack_strategy == "phishing":
             success_rate = 0.16 
         else:
             success_rate = 0.17  
-        return np.random.rand() < success_rate
+        return self.model.rng.random() < success_rate
 
 
 class DefenderAgent(Agent):
@@ -83,13 +91,18 @@ class DefenderAgent(Agent):
         self.target_breach_rate = 0.3
 
 
-def run_simulation(steps=100, attacker_strategy=None):
+def run_simulation(steps=100, attacker_strategy=None, tracer=NULL_TRACER, trace_interval=10, record_every=1,
+                   rng=None, profiler=NULL_PROFILER):
     print("\n=== Agent-Based Simulation (Pure RBAC) ===\n")
 
     model = PureRBACModel(
         num_employees=100,
         num_attackers=50,
-        attacker_strategy=attacker_strategy
+        attacker_strategy=attacker_strategy,
+        horizon=steps,
+        record_every=record_every,
+        rng=rng,
+        profiler=profiler
     )
 
     print("Initial state:")
@@ -100,9 +113,8 @@ def run_simulation(steps=100, attacker_strategy=None):
     print("\nRunning simulation...")
     for i in range(steps):
         model.step()
-        if i % 10 == 0:
-            breach_ma = model.get_moving_breach_rate()
-            print(f"Step {i}: Policy = {model.policy}, Moving Average breach = {breach_ma:.4f}")
+        if tracer.level >= STEP and i % trace_interval == 0:
+            tracer.event("step", i, rbac_share=1.0, breach_rate=model.get_moving_breach_rate())
 
     results = model.datacollector.get_model_vars_dataframe()
     final_breach_rate = model.get_current_breach_rate()
@@ -115,14 +127,21 @@ def run_simulation(steps=100, attacker_strategy=None):
     print(f"  Final (instant) breach rate: {final_breach_rate:.4f}")
     print(f"  Final (moving average) breach rate: {final_breach_ma:.4f}")
 
+    if profiler.enabled:
+        print("\nStep profile:")
+        print(profiler.format_table())
+
     return results
 
 
 def create_visualization(results):
     print("\n=== Visualization (Pure RBAC) ===\n")
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
 
     plt.figure(figsize=(12, 8))
-    plt.plot(results["Breach Rate"], label="Moving Average Breach", color='blue')
+    plot_series(plt.gca(), results["Breach Rate"], label="Moving Average Breach", color='blue')
     plt.title("Security Breach Rate Over Time (Pure RBAC)")
     plt.xlabel("Simulation Steps")
     plt.ylabel("Breach Rate")
@@ -136,6 +155,6 @@ def create_visualization(results):
 if __name__ == "__main__":
     print("=== Pure RBAC Access Control Policy Modeling ===")
     attacker_strategy = [0.5, 0.5]
-    sim_results = run_simulation(steps=100, attacker_strategy=attacker_strategy)
+    sim_results = run_simulation(steps=100, attacker_strategy=attacker_strategy, tracer=Tracer(STEP, echo=True))
     create_visualization(sim_results)
     print("\n=== Analysis Complete ===")
@@ -0,0 +1,150 @@
+import contextlib
+import json
+import os
+
+import numpy as np
+
+COLUMNS_META = "recording.json"
+
+
+class ColumnRecorder:
+    """Per-step model variables in preallocated, typed NumPy columns.
+
+    A drop-in for the model-level half of Mesa's DataCollector: the model passes the
+    values of one step to record() instead of the collector calling a lambda per
+    column. Columns are allocated for `horizon` records up front and doubled when a
+    run outlives it. With every=k only every k-th step is stored, so a long run can
+    be kept at a fixed resolution. Constant metadata (e.g. the policy of a pure
+    model) goes in `attrs` and ends up in DataFrame.attrs rather than in a column.
+    """
+
+    def __init__(self, columns, horizon=None, every=1, attrs=None):
+        if every < 1:
+            raise ValueError("every must be a positive number of steps.")
+        self.names = list(columns)
+        self.dtypes = [np.dtype(columns[name]) for name in self.names]
+        self.every = every
+        self.attrs = dict(attrs or {})
+        self.steps = 0
+        self.count = 0
+        capacity = max(1, -(-horizon // every)) if horizon else 1024
+        self._columns = [np.empty(capacity, dtype=dtype) for dtype in self.dtypes]
+
+    @property
+    def capacity(self):
+        return len(self._columns[0])
+
+    def record(self, *values):
+        """Store one step's values, in column order; steps between every-th ones are skipped."""
+        step = self.steps
+        self.steps += 1
+        if step % self.every:
+            return
+        if self.count == self.capacity:
+            self._grow()
+        for column, value in zip(self._columns, values):
+            column[self.count] = value
+        self.count += 1
+
+    def _grow(self, minimum=0):
+        capacity = max(2 * self.capacity, minimum, 1)
+        grown = []
+        for column in self._columns:
+            new_column = np.empty(capacity, dtype=column.dtype)
+            new_column[:self.count] = column[:self.count]
+            grown.append(new_column)
+        self._columns = grown
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if state.pop("_pickle_without_rows", False):
+            state["_columns"] = [column[:0] for column in self._columns]
+            state["count"] = 0
+        return state
+
+    @contextlib.contextmanager
+    def pickling_without_rows(self):
+        """Within the block, pickling the recorder leaves out its records (it unpickles empty, settings intact)."""
+        self._pickle_without_rows = True
+        try:
+            yield self
+        finally:
+            del self._pickle_without_rows
+
+    def rows(self, start=0):
+        """Records from index `start` on, as a dict of array views."""
+        return {name: column[start:self.count] for name, column in zip(self.names, self._columns)}
+
+    def extend(self, columns):
+        """Append already recorded rows, e.g. ones restored from a checkpoint; `steps` is left as is."""
+        size = len(columns[self.names[0]])
+        if self.count + size > self.capacity:
+            self._grow(self.count + size)
+        for name, column in zip(self.names, self._columns):
+            column[self.count:self.count + size] = columns[name]
+        self.count += size
+
+    def columns(self):
+        """Recorded values as a dict of array views (invalidated when the recorder grows)."""
+        return {name: column[:self.count] for name, column in zip(self.names, self._columns)}
+
+    def step_index(self):
+        return np.arange(0, self.count * self.every, self.every)
+
+    def to_dataframe(self):
+        """The recording as a DataFrame over the recorded steps, sharing memory with the columns."""
+        import pandas as pd
+        frame = pd.DataFrame(self.columns(), index=pd.RangeIndex(0, self.count * self.every, self.every),
+                             copy=False)
+        frame.attrs.update(self.attrs)
+        return frame
+
+    # Same name as DataCollector, so existing callers keep working.
+    get_model_vars_dataframe = to_dataframe
+
+    def save_npz(self, path):
+        np.savez(path, __every__=self.every, __attrs__=json.dumps(self.attrs), **self.columns())
+
+    def save_columns(self, directory):
+        """Write each column to its own .npy file in `directory`, so readers can memory-map them (load_columns)."""
+        os.makedirs(directory, exist_ok=True)
+        for name, column in self.columns().items():
+            np.save(os.path.join(directory, f"{name}.npy"), column)
+        with open(os.path.join(directory, COLUMNS_META), "w") as handle:
+            json.dump({"columns": self.names, "every": self.every, "attrs": self.attrs}, handle)
+
+    def save_parquet(self, path):
+        """Write the columns to Parquet (requires pyarrow); attrs are stored as schema metadata."""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ImportError("Parquet export requires pyarrow (pip install pyarrow).") from exc
+        columns = dict(step=self.step_index(), **self.columns())
+        table = pa.table(columns, metadata={"attrs": json.dumps(self.attrs), "every": str(self.every)})
+        pq.write_table(table, path)
+
+
+def load_recording(path):
+    """Read a recording written by ColumnRecorder.save_npz back as a DataFrame."""
+    import pandas as pd
+    with np.load(path) as stored:
+        every = int(stored["__every__"])
+        attrs = json.loads(str(stored["__attrs__"]))
+        columns = {name: stored[name] for name in stored.files if not name.startswith("__")}
+    count = len(next(iter(columns.values()))) if columns else 0
+    frame = pd.DataFrame(columns, index=pd.RangeIndex(0, count * every, every), copy=False)
+    frame.attrs.update(attrs)
+    return frame
+
+
+def load_columns(directory, mmap_mode="r"):
+    """Open a recording written by ColumnRecorder.save_columns: returns (columns, every, attrs).
+
+    Columns are memory-mapped by default, so only the parts that are read are loaded.
+    """
+    with open(os.path.join(directory, COLUMNS_META)) as handle:
+        meta = json.load(handle)
+    columns = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode)
+               for name in meta["columns"]}
+    return columns, meta["every"], meta["attrs"]
@@ -0,0 +1,337 @@
+import multiprocessing
+import queue
+import time
+import warnings
+from collections import namedtuple
+
+import numpy as np
+
+SolveResult = namedtuple("SolveResult", ["equilibria", "method", "solve_time", "timed_out"])
+
+# Largest strategy count per player for which every equilibrium is still enumerated.
+SUPPORT_ENUMERATION_MAX_STRATEGIES = 4
+VERTEX_ENUMERATION_MAX_STRATEGIES = 6
+
+
+class SolverTimeout(Exception):
+    """Raised inside a solver when its time budget is exhausted."""
+
+
+def is_zero_sum(defender_payoffs, attacker_payoffs, tol=1e-12):
+    return np.allclose(defender_payoffs, -np.asarray(attacker_payoffs), rtol=0, atol=tol)
+
+
+def choose_method(defender_payoffs, attacker_payoffs):
+    """Pick a solver from the size and structure of the game."""
+    if is_zero_sum(defender_payoffs, attacker_payoffs):
+        return "linear_program"
+    size = max(np.shape(defender_payoffs))
+    if size <= SUPPORT_ENUMERATION_MAX_STRATEGIES:
+        return "support_enumeration"
+    if size <= VERTEX_ENUMERATION_MAX_STRATEGIES:
+        return "vertex_enumeration"
+    return "lemke_howson"
+
+
+def _check_deadline(deadline):
+    if deadline is not None and time.perf_counter() > deadline:
+        raise SolverTimeout
+
+
+def _enumerate_in_worker(name, defender_payoffs, attacker_payoffs, results):
+    """Worker process body: put each equilibrium nashpy's `name` enumerator yields, then None."""
+    import nashpy as nash
+    try:
+        game = nash.Game(defender_payoffs, attacker_payoffs)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            for equilibrium in getattr(game, name)():
+                results.put(equilibrium)
+    except Exception as error:
+        results.put(error)
+    results.put(None)
+
+
+def _nashpy_enumeration(name):
+    """nashpy's `name` enumerator as a solver.
+
+    nashpy only yields once it has an equilibrium, and may search for a long time between
+    yields, so under a deadline it runs in a worker process that streams equilibria back
+    and is terminated when the deadline passes.
+    """
+    def solve(defender_payoffs, attacker_payoffs, deadline, found):
+        if deadline is None:
+            import nashpy as nash
+            game = nash.Game(defender_payoffs, attacker_payoffs)
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)
+                found.extend(getattr(game, name)())
+            return
+
+        context = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods()
+                                              else None)
+        results = context.Queue()
+        worker = context.Process(target=_enumerate_in_worker, args=(name, defender_payoffs, attacker_payoffs,
+                                                                   results), daemon=True)
+        worker.start()
+        try:
+            while True:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    raise SolverTimeout
+                try:
+                    item = results.get(timeout=remaining)
+                except queue.Empty:
+                    raise SolverTimeout from None
+                if item is None:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                found.append(item)
+        finally:
+            if worker.is_alive():
+                worker.terminate()
+            worker.join()
+            results.close()
+    return solve
+
+
+def _linear_program(defender_payoffs, attacker_payoffs, deadline, found):
+    """Minimax solution of a zero-sum game; the attacker's payoffs are implied by the defender's."""
+    import nashpy as nash
+    found.append(nash.Game(defender_payoffs).linear_program())
+
+
+def _min_ratio_row(tableau, column, slack_columns, tol):
+    """Leaving row for `column` by the lexicographic minimum-ratio test (degeneracy safe)."""
+    pivot_column = tableau[:, column]
+    rows = np.flatnonzero(pivot_column > tol)
+    for key in [-1] + slack_columns:
+        ratios = tableau[rows, key] / pivot_column[rows]
+        rows = rows[ratios <= ratios.min() + tol]
+        if rows.size == 1:
+            break
+    return rows[0]
+
+
+def _pivot(tableau, row, column):
+    tableau[row] /= tableau[row, column]
+    pivot_row = tableau[row].copy()
+    tableau -= np.outer(tableau[:, column], pivot_row)
+    tableau[row] = pivot_row
+
+
+def lemke_howson(defender_payoffs, attacker_payoffs, initial_dropped_label=0, deadline=None,
+                 max_pivots=100000, tol=1e-12):
+    """One equilibrium by complementary pivoting from `initial_dropped_label`.
+
+    Labels 0..m-1 are the defender's strategies and m..m+n-1 the attacker's. Tableau
+    columns are ordered by label, so the entering column is the label itself.
+    """
+    A = np.asarray(defender_payoffs, dtype=float)
+    B = np.asarray(attacker_payoffs, dtype=float)
+    m, n = A.shape
+    A = A - A.min() + 1
+    B = B - B.min() + 1
+
+    # Attacker's polytope: r + A y = 1 (basis labels 0..m-1 are the slacks r).
+    # Defender's polytope: B^T x + s = 1 (basis labels m..m+n-1 are the slacks s).
+    tableaux = [np.hstack([np.eye(m), A, np.ones((m, 1))]),
+                np.hstack([B.T, np.eye(n), np.ones((n, 1))])]
+    bases = [list(range(m)), list(range(m, m + n))]
+    slack_columns = [list(range(m)), list(range(m, m + n))]
+
+    entering = initial_dropped_label
+    player = 1 if entering < m else 0
+    for _ in range(max_pivots):
+        _check_deadline(deadline)
+        tableau = tableaux[player]
+        row = _min_ratio_row(tableau, entering, slack_columns[player], tol)
+        _pivot(tableau, row, entering)
+        leaving, bases[player][row] = bases[player][row], entering
+        if leaving == initial_dropped_label:
+            break
+        entering = leaving
+        player = 1 - player
+    else:
+        raise RuntimeError("Lemke-Howson did not terminate within max_pivots.")
+
+    x = np.zeros(m)
+    y = np.zeros(n)
+    for row, label in enumerate(bases[1]):
+        if label < m:
+            x[label] = tableaux[1][row, -1]
+    for row, label in enumerate(bases[0]):
+        if label >= m:
+            y[label - m] = tableaux[0][row, -1]
+    return x / x.sum(), y / y.sum()
+
+
+def _lemke_howson_enumeration(defender_payoffs, attacker_payoffs, deadline, found):
+    m, n = np.shape(defender_payoffs)
+    seen = set()
+    for label in range(m + n):
+        p, q = lemke_howson(defender_payoffs, attacker_payoffs, label, deadline)
+        key = tuple(np.round(np.concatenate([p, q]), 9))
+        if key not in seen:
+            seen.add(key)
+            found.append((p, q))
+
+
+SOLVERS = {
+    "support_enumeration": _nashpy_enumeration("support_enumeration"),
+    "vertex_enumeration": _nashpy_enumeration("vertex_enumeration"),
+    "linear_program": _linear_program,
+    "lemke_howson": _lemke_howson_enumeration,
+}
+
+
+def solve_game(defender_payoffs, attacker_payoffs, method="auto", time_budget=None):
+    """Solve an n x m bimatrix game and return a SolveResult.
+
+    `method` is "auto" or a key of SOLVERS. With a `time_budget` (seconds) the solver
+    stops once the budget is spent and returns the equilibria found so far with
+    timed_out=True.
+    """
+    defender_payoffs = np.asarray(defender_payoffs, dtype=float)
+    attacker_payoffs = np.asarray(attacker_payoffs, dtype=float)
+    if defender_payoffs.shape != attacker_payoffs.shape or defender_payoffs.ndim != 2:
+        raise ValueError("Payoff matrices must be 2-D and share the same shape.")
+    if method == "auto":
+        method = choose_method(defender_payoffs, attacker_payoffs)
+    if method not in SOLVERS:
+        raise ValueError(f"Unknown solver '{method}'. Choose from: {', '.join(SOLVERS)}")
+
+    start = time.perf_counter()
+    deadline = start + time_budget if time_budget is not None else None
+    found = []
+    timed_out = False
+    try:
+        SOLVERS[method](defender_payoffs, attacker_payoffs, deadline, found)
+    except SolverTimeout:
+        timed_out = True
+    return SolveResult(found, method, time.perf_counter() - start, timed_out)
+
+
+def support_of(strategy, tol=1e-9):
+    return np.flatnonzero(np.asarray(strategy) > tol)
+
+
+def _indifferent_mix(payoffs, tol):
+    """Mix over the columns of `payoffs` giving every row the same payoff: (mix, value), or (None, None)."""
+    k = payoffs.shape[0]
+    system = np.zeros((k + 1, k + 1))
+    system[:k, :k] = payoffs
+    system[:k, k] = -1
+    system[k, :k] = 1
+    rhs = np.zeros(k + 1)
+    rhs[k] = 1
+    try:
+        solution = np.linalg.solve(system, rhs)
+    except np.linalg.LinAlgError:
+        return None, None
+    mix = solution[:k]
+    if (mix < -tol).any():
+        return None, None
+    return np.clip(mix, 0, None), solution[k]
+
+
+def equilibrium_on_support(defender_payoffs, attacker_payoffs, rows, columns, tol=1e-9):
+    """The equilibrium of the game with supports `rows` and `columns`, or None if there is none.
+
+    Solves each player's indifference conditions on the supports, then checks that no
+    strategy outside a support does better. This is a single step of support enumeration.
+    """
+    A = np.asarray(defender_payoffs, dtype=float)
+    B = np.asarray(attacker_payoffs, dtype=float)
+    if len(rows) != len(columns) or len(rows) == 0:
+        return None
+    q_support, defender_value = _indifferent_mix(A[np.ix_(rows, columns)], tol)
+    p_support, attacker_value = _indifferent_mix(B[np.ix_(rows, columns)].T, tol)
+    if q_support is None or p_support is None:
+        return None
+    p = np.zeros(A.shape[0])
+    q = np.zeros(A.shape[1])
+    p[rows] = p_support
+    q[columns] = q_support
+    if (A @ q).max() > defender_value + tol or (p @ B).max() > attacker_value + tol:
+        return None
+    return p, q
+
+
+def solve_game_warm(defender_payoffs, attacker_payoffs, previous, method="auto", time_budget=None):
+    """solve_game, first trying the supports of the `previous` (defender, attacker) equilibrium.
+
+    When payoffs drift a little the equilibrium usually keeps its supports, and then a
+    single linear solve finds it (method "warm_start"); otherwise the game is solved in full.
+    """
+    start = time.perf_counter()
+    equilibrium = equilibrium_on_support(defender_payoffs, attacker_payoffs,
+                                         support_of(previous[0]), support_of(previous[1]))
+    if equilibrium is not None:
+        return SolveResult([equilibrium], "warm_start", time.perf_counter() - start, False)
+    return solve_game(defender_payoffs, attacker_payoffs, method, time_budget)
+
+
+BatchEquilibria = namedtuple("BatchEquilibria", ["pure", "defender_mixed", "attacker_mixed", "has_mixed", "degenerate"])
+
+
+def solve_2x2_batch(defender_payoffs, attacker_payoffs):
+    """Closed-form equilibria of N stacked 2x2 games (payoff arrays of shape (N, 2, 2)).
+
+    Returns a BatchEquilibria with
+      pure           (N, 2, 2) bool, pure[k, i, j] when (row i, column j) is an equilibrium of game k,
+      defender_mixed (N, 2) and attacker_mixed (N, 2): the interior mixed equilibrium (NaN if none),
+      has_mixed      (N,) bool,
+      degenerate     (N,) bool, set when a player is indifferent between its pure strategies
+                     against some pure strategy of the opponent; such games can have a continuum
+                     of equilibria that the arrays above do not describe.
+    """
+    A = np.asarray(defender_payoffs, dtype=float).reshape(-1, 2, 2)
+    B = np.asarray(attacker_payoffs, dtype=float).reshape(-1, 2, 2)
+
+    row_best = A >= A[:, ::-1, :]
+    column_best = B >= B[:, :, ::-1]
+    pure = row_best & column_best
+
+    degenerate = (A[:, 0, :] == A[:, 1, :]).any(axis=1) | (B[:, :, 0] == B[:, :, 1]).any(axis=1)
+
+    # q makes the defender indifferent between its rows, p makes the attacker indifferent between its columns.
+    defender_denominator = A[:, 0, 0] - A[:, 0, 1] - A[:, 1, 0] + A[:, 1, 1]
+    attacker_denominator = B[:, 0, 0] - B[:, 1, 0] - B[:, 0, 1] + B[:, 1, 1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        q = (A[:, 1, 1] - A[:, 0, 1]) / defender_denominator
+        p = (B[:, 1, 1] - B[:, 1, 0]) / attacker_denominator
+    has_mixed = (~degenerate & (defender_denominator != 0) & (attacker_denominator != 0)
+                 & (p > 0) & (p < 1) & (q > 0) & (q < 1))
+
+    p = np.where(has_mixed, p, np.nan)
+    q = np.where(has_mixed, q, np.nan)
+    return BatchEquilibria(pure,
+                           np.stack([p, 1 - p], axis=1),
+                           np.stack([q, 1 - q], axis=1),
+                           has_mixed,
+                           degenerate)
+
+
+def compare_with_nashpy(defender_payoffs, attacker_payoffs, batch=None, tol=1e-9):
+    """Indices of non-degenerate games where solve_2x2_batch and nashpy support enumeration disagree."""
+    import nashpy as nash
+    A = np.asarray(defender_payoffs, dtype=float).reshape(-1, 2, 2)
+    B = np.asarray(attacker_payoffs, dtype=float).reshape(-1, 2, 2)
+    batch = batch or solve_2x2_batch(A, B)
+    mismatches = []
+    for k in np.flatnonzero(~batch.degenerate):
+        expected = []
+        for i, j in zip(*np.nonzero(batch.pure[k])):
+            expected.append(np.array([1.0 - i, float(i), 1.0 - j, float(j)]))
+        if batch.has_mixed[k]:
+            expected.append(np.concatenate([batch.defender_mixed[k], batch.attacker_mixed[k]]))
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            found = [np.concatenate(eq) for eq in nash.Game(A[k], B[k]).support_enumeration()]
+        matched = len(found) == len(expected) and all(
+            any(np.allclose(f, e, atol=tol) for e in expected) for f in found)
+        if not matched:
+            mismatches.append(int(k))
+    return mismatches
@@ -0,0 +1,80 @@
+import numpy as np
+
+
+class RollingStats:
+    """Rolling statistics of a stream over a fixed window, updated in O(1) per value.
+
+    The last `window` values live in a ring buffer alongside their running sum (and sum
+    of squares when track_variance is set), so memory is bounded by the window however
+    long the stream. The running sums are recomputed from the buffer every
+    `resync_every` updates to keep floating-point drift from accumulating. The
+    exponentially weighted mean covers the whole stream; its smoothing factor defaults
+    to 2 / (window + 1), the span convention of pandas' ewm.
+    """
+
+    def __init__(self, window=10, ewma_alpha=None, track_variance=False, resync_every=1024):
+        if window < 1:
+            raise ValueError("window must be at least 1.")
+        self.window = window
+        self.ewma_alpha = 2.0 / (window + 1) if ewma_alpha is None else ewma_alpha
+        self.track_variance = track_variance
+        self.resync_every = resync_every
+        self.count = 0
+        self.ewma = 0.0
+        self._buffer = [0.0] * window
+        self._sum = 0.0
+        self._sum_sq = 0.0
+
+    def __len__(self):
+        """Number of values pushed so far (not capped by the window)."""
+        return self.count
+
+    def push(self, value):
+        value = float(value)
+        slot = self.count % self.window
+        old = self._buffer[slot]
+        self._buffer[slot] = value
+        self._sum += value - old
+        if self.track_variance:
+            self._sum_sq += value * value - old * old
+        self.ewma = value if self.count == 0 else self.ewma + self.ewma_alpha * (value - self.ewma)
+        self.count += 1
+        if self.count % self.resync_every == 0:
+            self._resync()
+
+    def _resync(self):
+        self._sum = sum(self._buffer)
+        if self.track_variance:
+            self._sum_sq = sum(v * v for v in self._buffer)
+
+    @property
+    def filled(self):
+        return min(self.count, self.window)
+
+    def mean(self):
+        """Mean of the values in the window, 0 before the first value."""
+        if self.count == 0:
+            return 0
+        return self._sum / self.filled
+
+    def variance(self, ddof=0):
+        if not self.track_variance:
+            raise RuntimeError("RollingStats was created without track_variance=True.")
+        n = self.filled
+        if n <= ddof:
+            return np.nan
+        mean = self._sum / n
+        return max(0.0, (self._sum_sq - n * mean * mean) / (n - ddof))
+
+    def values(self):
+        """The values in the window, oldest first."""
+        if self.count <= self.window:
+            return np.array(self._buffer[:self.count])
+        start = self.count % self.window
+        return np.array(self._buffer[start:] + self._buffer[:start])
+
+    def quantile(self, q):
+        """Quantile(s) of the window, computed on demand from the buffer."""
+        if self.count == 0:
+            return np.nan
+        return np.quantile(self.values(), q)
@@ -0,0 +1,203 @@
+import glob
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from batch_engine import ScenarioBatch
+from hybrid import AccessControlModel, run_game_theory_analysis
+
+CONTROLLER_PARAMETERS = ("K_s", "K_u", "damping_factor", "damping_horizon")
+SWEEP_DEFAULTS = {
+    "K_s": 0.15,
+    "K_u": 0.15,
+    "damping_factor": 0.7,
+    "damping_horizon": 50,
+    "phishing_prob": 0.5,
+}
+RESULT_COLUMNS = ("config_id",) + tuple(SWEEP_DEFAULTS) + (
+    "final_rbac", "final_abac", "final_breach_ma", "settling_time")
+
+
+def parameter_grid(**axes):
+    """Yield one configuration dict per point of the Cartesian product of `axes`.
+
+    Each axis is a scalar or any iterable of values (list, range, np.linspace, ...).
+    Parameters that are not given keep their SWEEP_DEFAULTS value.
+    """
+    unknown = set(axes) - set(SWEEP_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}")
+    names = list(SWEEP_DEFAULTS)
+    values = []
+    for name in names:
+        axis = axes.get(name, SWEEP_DEFAULTS[name])
+        values.append(list(np.atleast_1d(axis).tolist()))
+    for point in itertools.product(*values):
+        yield dict(zip(names, point))
+
+
+def settling_time(series, tolerance):
+    """First step after which `series` stays within `tolerance` of its final value."""
+    outside = np.flatnonzero(np.abs(series - series[-1]) > tolerance)
+    return int(outside[-1] + 1) if outside.size else 0
+
+
+def settling_times(series, tolerance):
+    """settling_time of every column of a (steps, S) array."""
+    outside = np.abs(series - series[-1]) > tolerance
+    last_outside = len(series) - np.argmax(outside[::-1], axis=0)
+    return np.where(outside.any(axis=0), last_outside, 0)
+
+
+def run_config(task):
+    """Run one sweep configuration and return its result row."""
+    config_id, config, steps, initial_policy_mix, num_attackers, vectorized, settle_tolerance, seed = task
+    phishing_prob = config["phishing_prob"]
+    model = AccessControlModel(
+        num_attackers=num_attackers,
+        initial_policy_mix=initial_policy_mix,
+        attacker_strategy=(phishing_prob, 1.0 - phishing_prob),
+        vectorized=vectorized,
+        defender_params={name: config[name] for name in CONTROLLER_PARAMETERS},
+        rng=np.random.default_rng(seed),
+    )
+    rbac_share = np.empty(steps)
+    for i in range(steps):
+        model.step()
+        rbac_share[i] = model.policy_mix[0]
+
+    final_rbac, final_abac = model.policy_mix
+    return dict(config_id=config_id, **config,
+                final_rbac=final_rbac,
+                final_abac=final_abac,
+                final_breach_ma=model.get_moving_breach_rate(),
+                settling_time=settling_time(rbac_share, settle_tolerance))
+
+
+class ColumnarResultWriter:
+    """Buffer result rows and flush them as numbered columnar .npz parts in a directory."""
+
+    def __init__(self, directory, chunk_rows=1000, overwrite=False):
+        self.directory = directory
+        self.chunk_rows = chunk_rows
+        self.rows_written = 0
+        self.parts_written = 0
+        os.makedirs(directory, exist_ok=True)
+        existing = glob.glob(os.path.join(directory, "part-*.npz"))
+        if existing and not overwrite:
+            raise FileExistsError(f"{directory} already holds sweep results; pass overwrite=True to replace them.")
+        for path in existing:
+            os.remove(path)
+        self._buffer = {name: [] for name in RESULT_COLUMNS}
+
+    def write(self, row):
+        for name in RESULT_COLUMNS:
+            self._buffer[name].append(row[name])
+        if len(self._buffer["config_id"]) >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        count = len(self._buffer["config_id"])
+        if count == 0:
+            return
+        path = os.path.join(self.directory, f"part-{self.parts_written:05d}.npz")
+        np.savez(path, **{name: np.asarray(values) for name, values in self._buffer.items()})
+        self.parts_written += 1
+        self.rows_written += count
+        self._buffer = {name: [] for name in RESULT_COLUMNS}
+
+    def close(self):
+        self.flush()
+
+
+def load_sweep_results(directory, columns=None):
+    """Load the sweep result table (optionally only some columns) as a DataFrame."""
+    columns = list(columns or RESULT_COLUMNS)
+    parts = sorted(glob.glob(os.path.join(directory, "part-*.npz")))
+    if not parts:
+        return pd.DataFrame(columns=columns)
+    chunks = {name: [] for name in columns}
+    for path in parts:
+        with np.load(path) as part:
+            for name in columns:
+                chunks[name].append(part[name])
+    return pd.DataFrame({name: np.concatenate(values) for name, values in chunks.items()})
+
+
+def run_sweep(grid, output_dir="sweep_results", steps=100, num_attackers=50, initial_policy_mix=None,
+              workers=None, vectorized=True, settle_tolerance=0.01, chunk_rows=1000, overwrite=False, seed=None):
+    """Run every configuration of `grid` across worker processes, streaming results to `output_dir`.
+
+    Only one summary row per configuration is kept, so memory does not grow with the
+    number of steps or configurations beyond the writer's chunk buffer. Configuration
+    k draws from the k-th SeedSequence spawned from `seed`, whatever the worker count.
+    """
+    if initial_policy_mix is None:
+        defender_strategy, _ = run_game_theory_analysis()
+        initial_policy_mix = tuple(defender_strategy)
+
+    root = np.random.SeedSequence(seed)
+    tasks = ((config_id, config, steps, tuple(initial_policy_mix), num_attackers, vectorized, settle_tolerance,
+              root.spawn(1)[0])
+             for config_id, config in enumerate(grid))
+
+    workers = workers or os.cpu_count() or 1
+    writer = ColumnarResultWriter(output_dir, chunk_rows, overwrite)
+    print(f"\n=== Controller Parameter Sweep ({workers} workers) ===\n")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for row in pool.map(run_config, tasks, chunksize=16):
+            writer.write(row)
+    writer.close()
+    print(f"{writer.rows_written} configurations written to: {output_dir}")
+    return writer.rows_written
+
+
+def run_sweep_batch(grid, output_dir="sweep_results", steps=100, num_attackers=50, initial_policy_mix=None,
+                    batch_size=4096, settle_tolerance=0.01, chunk_rows=1000, overwrite=False, seed=None):
+    """run_sweep in-process, advancing `batch_size` configurations at a time as one ScenarioBatch."""
+    if initial_policy_mix is None:
+        defender_strategy, _ = run_game_theory_analysis()
+        initial_policy_mix = tuple(defender_strategy)
+
+    rng = np.random.default_rng(seed)
+    writer = ColumnarResultWriter(output_dir, chunk_rows, overwrite)
+    print(f"\n=== Controller Parameter Sweep (batches of {batch_size}) ===\n")
+    grid = iter(grid)
+    config_id = 0
+    while True:
+        configs = list(itertools.islice(grid, batch_size))
+        if not configs:
+            break
+        columns = {name: np.array([config[name] for config in configs]) for name in SWEEP_DEFAULTS}
+        batch = ScenarioBatch(rbac_share=initial_policy_mix[0], phishing_prob=columns["phishing_prob"],
+                              num_attackers=num_attackers, rng=rng,
+                              **{name: columns[name] for name in CONTROLLER_PARAMETERS})
+        # Records hold the share at the start of each step; run_config tracks it after each step.
+        rbac_share = np.vstack([batch.run(steps)["RBAC Policy"][1:], batch.rbac_share])
+        settled = settling_times(rbac_share, settle_tolerance)
+        final_breach_ma = batch.moving_breach_rate()
+        for k, config in enumerate(configs):
+            writer.write(dict(config_id=config_id + k, **config,
+                              final_rbac=batch.rbac_share[k],
+                              final_abac=1 - batch.rbac_share[k],
+                              final_breach_ma=final_breach_ma[k],
+                              settling_time=settled[k]))
+        config_id += len(configs)
+    writer.close()
+    print(f"{writer.rows_written} configurations written to: {output_dir}")
+    return writer.rows_written
+
+
+if __name__ == "__main__":
+    sweep_grid = parameter_grid(
+        K_s=np.linspace(0.05, 0.5, 10),
+        K_u=np.linspace(0.05, 0.5, 10),
+        damping_factor=[0.5, 0.7, 0.9],
+        phishing_prob=[0.3, 0.5, 0.7],
+    )
+    run_sweep(sweep_grid, output_dir="sweep_results", steps=100, overwrite=True)
+    table = load_sweep_results("sweep_results")
+    print(table.sort_values("final_breach_ma").head(10).to_string(index=False))
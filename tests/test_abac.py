@@ -0,0 +1,68 @@
+import copy
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ABAC_env"))
+
+import abac
+
+STAFF = {'role': 'Staff', 'department': 'HR', 'clearance': 1}
+
+
+@pytest.fixture
+def restore_resources():
+    original = copy.deepcopy(dict(abac.resources))
+    yield
+    abac.resources = original
+
+
+def test_cached_decisions_follow_policy_edits(restore_resources):
+    assert abac.check_access_cached(STAFF, 'general_page')
+    abac.resources['general_page']['required_clearance'] = 3
+    assert not abac.check_access(STAFF, 'general_page')
+    assert not abac.check_access_cached(STAFF, 'general_page')
+
+    abac.resources['general_page'] = {'required_clearance': 1}
+    assert abac.check_access_cached(STAFF, 'general_page')
+    del abac.resources['general_page']
+    abac.resources.setdefault('general_page', {'required_role': 'Admin'})
+    assert not abac.check_access_cached(STAFF, 'general_page')
+
+
+def test_cached_decisions_follow_a_rebound_table(restore_resources):
+    assert not abac.check_access_cached(STAFF, 'admin_page')
+    abac.resources = {'admin_page': {}}
+    assert abac.check_access(STAFF, 'admin_page')
+    assert abac.check_access_cached(STAFF, 'admin_page')
+    abac.resources['admin_page']['required_role'] = 'Admin'
+    assert not abac.check_access_cached(STAFF, 'admin_page')
+
+
+def random_users(rng, count):
+    """Users with random attributes; some have None or no role/department, some no clearance."""
+    roles = ['Admin', 'Engineer', 'Staff', None]
+    departments = ['Administration', 'Engineering', 'Support', 'HR', None]
+    users = []
+    for _ in range(count):
+        user = {'role': roles[rng.integers(len(roles))],
+                'department': departments[rng.integers(len(departments))],
+                'clearance': int(rng.integers(0, 7))}
+        for name in ('role', 'department', 'clearance'):
+            if rng.random() < 0.1:
+                del user[name]
+        users.append(user)
+    return users
+
+
+def test_compiled_policy_matches_check_access():
+    rng = np.random.default_rng(0)
+    users = random_users(rng, 2000)
+    policy = abac.CompiledPolicy()
+    names = policy.resource_names + ['unlisted_page']
+    expected = np.array([[abac.check_access(user, name) for name in names] for user in users])
+
+    np.testing.assert_array_equal(policy.evaluate(users), expected[:, :-1])
+    np.testing.assert_array_equal(policy.evaluate(abac.users_to_columns(users), names), expected)
@@ -0,0 +1,60 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hybrid import AccessControlModel
+from mean_field import mean_field_trajectory
+
+EQUILIBRIUM = ((0.6279, 0.3721), (0.5430, 0.4570))
+STEPS = 200
+
+
+def replication_mean(replications, vectorized, seed=0):
+    """Mean RBAC share and breach rate per step over seeded AccessControlModel runs."""
+    runs = []
+    for replication in range(replications):
+        model = AccessControlModel(initial_policy_mix=EQUILIBRIUM[0], attacker_strategy=EQUILIBRIUM[1],
+                                   vectorized=vectorized, rng=[seed, replication])
+        for _ in range(STEPS):
+            model.step()
+        columns = model.datacollector.columns()
+        runs.append((columns["RBAC Policy"], columns["Breach Rate"]))
+    return np.mean(runs, axis=0)
+
+
+def gaps(replications, vectorized):
+    expected = mean_field_trajectory(STEPS, *EQUILIBRIUM)
+    rbac_share, breach_rate = replication_mean(replications, vectorized)
+    return (np.abs(rbac_share - expected["RBAC Policy"]).max(),
+            np.abs(breach_rate - expected["Breach Rate"]).max())
+
+
+def test_replication_mean_approaches_mean_field():
+    few = gaps(10, vectorized=True)
+    many = gaps(160, vectorized=True)
+    assert many[0] < few[0] and many[1] < few[1]
+    assert many[0] < 0.002 and many[1] < 0.005
+
+
+def test_agent_model_stays_near_mean_field():
+    rbac_gap, breach_gap = gaps(20, vectorized=False)
+    assert rbac_gap < 0.005 and breach_gap < 0.01
+
+
+@pytest.mark.parametrize("params", [
+    {},
+    {"initial_policy_mix": (0.1, 0.9)},
+    {"K_s": 0.05, "K_u": 0.5},
+    {"K_s": 0.9, "K_u": 0.05},
+    {"K_s": 0.5, "K_u": 0.1, "attacker_strategy": (0.9, 0.1)},
+])
+def test_steady_state_tail_matches_exact_recursion(params):
+    steps = 50_000
+    exact = mean_field_trajectory(steps, settle_steps=steps, **params)
+    fast = mean_field_trajectory(steps, **params)
+    for name in exact:
+        np.testing.assert_allclose(fast[name], exact[name], rtol=0, atol=1e-8)
@@ -0,0 +1,37 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hybrid import ATTACKER_PAYOFFS, DEFENDER_PAYOFFS
+from solvers import compare_with_nashpy, solve_2x2_batch
+
+
+def test_batch_matches_nashpy_on_perturbed_hybrid_payoffs():
+    rng = np.random.default_rng(0)
+    defender = np.asarray(DEFENDER_PAYOFFS) + rng.normal(0, 0.5, (300, 2, 2))
+    attacker = np.asarray(ATTACKER_PAYOFFS) + rng.normal(0, 0.5, (300, 2, 2))
+    batch = solve_2x2_batch(defender, attacker)
+    assert batch.has_mixed.sum() > 250
+    assert compare_with_nashpy(defender, attacker, batch) == []
+
+
+def test_batch_on_degenerate_integer_games():
+    rng = np.random.default_rng(1)
+    defender = rng.integers(-2, 3, (300, 2, 2)).astype(float)
+    attacker = rng.integers(-2, 3, (300, 2, 2)).astype(float)
+    batch = solve_2x2_batch(defender, attacker)
+
+    ties = ((defender[:, 0, :] == defender[:, 1, :]).any(axis=1)
+            | (attacker[:, :, 0] == attacker[:, :, 1]).any(axis=1))
+    np.testing.assert_array_equal(batch.degenerate, ties)
+    assert 0 < ties.sum() < len(ties)
+    # Games with ties are flagged and skipped; every other game must agree with nashpy.
+    assert compare_with_nashpy(defender, attacker, batch) == []
+
+    # Every reported pure equilibrium is one: no player gains by deviating.
+    for k, i, j in zip(*np.nonzero(batch.pure)):
+        assert defender[k, i, j] >= defender[k, 1 - i, j]
+        assert attacker[k, i, j] >= attacker[k, i, 1 - j]
@@ -0,0 +1,138 @@
+import json
+
+import numpy as np
+
+# Verbosity levels: each includes the ones below it.
+QUIET = 0
+SUMMARY = 1
+STEP = 2
+ATTEMPT = 3
+
+EVENT_KINDS = ["attempt", "access", "detection", "step"]
+ATTACK_VECTORS = ["phishing", "token_theft"]
+
+EVENT_DTYPE = np.dtype([
+    ("kind", np.uint8),           # index into EVENT_KINDS
+    ("seq", np.int64),            # attempt number or simulation step
+    ("victim", np.int32),         # index into Tracer.strings, -1 if unset
+    ("vector", np.int8),          # index into ATTACK_VECTORS, -1 if unset
+    ("outcome", np.int8),         # attack succeeded (1) / failed (0), -1 if unset
+    ("resource", np.int32),       # index into Tracer.strings, -1 if unset
+    ("decision", np.int8),        # access granted (1) / denied (0), -1 if unset
+    ("rbac_share", np.float64),   # step events: RBAC share of the policy mix
+    ("breach_rate", np.float64),  # step events: moving-average breach rate
+])
+
+_KIND_CODES = {kind: i for i, kind in enumerate(EVENT_KINDS)}
+_VECTOR_CODES = {vector: i for i, vector in enumerate(ATTACK_VECTORS)}
+
+
+class Tracer:
+    """Buffered structured event trace.
+
+    Events go into a fixed-size ring buffer of EVENT_DTYPE records; strings (usernames,
+    resources) are interned into `strings`. With a `spill_path`, every full buffer is
+    appended to that raw binary file before it is overwritten, so the whole run can be
+    replayed with load_trace(). Call sites check `tracer.level` before building an event,
+    which keeps an untraced run free of tracing work.
+    """
+
+    def __init__(self, level=QUIET, capacity=65536, spill_path=None, echo=False):
+        self.level = level
+        self.capacity = capacity
+        self.spill_path = spill_path
+        self.echo = echo
+        self.buffer = np.zeros(capacity, dtype=EVENT_DTYPE)
+        self.count = 0
+        self.strings = []
+        self._string_ids = {}
+        self._spill_file = None
+
+    def intern(self, value):
+        if value is None:
+            return -1
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = self._string_ids[value] = len(self.strings)
+            self.strings.append(value)
+        return string_id
+
+    def event(self, kind, seq=-1, victim=None, vector=None, outcome=None, resource=None, decision=None,
+              rbac_share=np.nan, breach_rate=np.nan):
+        self.buffer[self.count % self.capacity] = (
+            _KIND_CODES[kind], seq, self.intern(victim), _VECTOR_CODES.get(vector, -1),
+            -1 if outcome is None else outcome, self.intern(resource),
+            -1 if decision is None else decision, rbac_share, breach_rate)
+        self.count += 1
+        if self.echo:
+            print(self.format(self.buffer[(self.count - 1) % self.capacity]))
+        if self.spill_path is not None and self.count % self.capacity == 0:
+            self._spill(self.buffer)
+
+    def _spill(self, records):
+        if self._spill_file is None:
+            self._spill_file = open(self.spill_path, "wb")
+        records.tofile(self._spill_file)
+
+    def events(self):
+        """The buffered events (the most recent `capacity` ones), oldest first."""
+        if self.count <= self.capacity:
+            return self.buffer[:self.count].copy()
+        start = self.count % self.capacity
+        return np.concatenate([self.buffer[start:], self.buffer[:start]])
+
+    def close(self):
+        """Spill the partially filled buffer and write the string table next to the trace file."""
+        if self.spill_path is None:
+            return
+        self._spill(self.buffer[:self.count % self.capacity])
+        self._spill_file.close()
+        self._spill_file = None
+        with open(self.spill_path + ".strings.json", "w") as handle:
+            json.dump(self.strings, handle)
+
+    def format(self, record):
+        kind = EVENT_KINDS[record["kind"]]
+        if kind == "step":
+            return (f"Step {record['seq']}: RBAC share = {record['rbac_share']:.4f}, "
+                    f"Moving Average breach = {record['breach_rate']:.4f}")
+        parts = [f"{kind} {record['seq']}"]
+        if record["victim"] >= 0:
+            parts.append(f"victim={self.strings[record['victim']]}")
+        if record["vector"] >= 0:
+            parts.append(f"vector={ATTACK_VECTORS[record['vector']]}")
+        if record["resource"] >= 0:
+            parts.append(f"resource={self.strings[record['resource']]}")
+        if record["outcome"] >= 0:
+            parts.append("-> Success" if record["outcome"] else "-> Failed")
+        if record["decision"] >= 0:
+            parts.append("-> ACCESS GRANTED" if record["decision"] else "-> Access Denied")
+        return " ".join(parts)
+
+
+def load_trace(spill_path):
+    """Read a spilled trace back as (events, strings)."""
+    events = np.fromfile(spill_path, dtype=EVENT_DTYPE)
+    with open(spill_path + ".strings.json") as handle:
+        strings = json.load(handle)
+    return events, strings
+
+
+def trace_dataframe(events, strings):
+    """Decode trace records into a pandas DataFrame for inspection or replay."""
+    import pandas as pd
+    lookup = np.array(strings + [None], dtype=object)
+    return pd.DataFrame({
+        "kind": np.array(EVENT_KINDS, dtype=object)[events["kind"]],
+        "seq": events["seq"],
+        "victim": lookup[events["victim"]],
+        "vector": np.array(ATTACK_VECTORS + [None], dtype=object)[events["vector"]],
+        "outcome": events["outcome"],
+        "resource": lookup[events["resource"]],
+        "decision": events["decision"],
+        "rbac_share": events["rbac_share"],
+        "breach_rate": events["breach_rate"],
+    })
+
+
+NULL_TRACER = Tracer(QUIET, capacity=1)
@@ -0,0 +1,177 @@
+import sqlite3
+
+import numpy as np
+
+CHUNK_SIZE = 50_000
+
+
+def iter_users(db_path, query, user_dict, chunk_size=CHUNK_SIZE):
+    """Stream users as user_dict(row) for the rows of `query`, holding at most chunk_size rows at a time."""
+    conn = sqlite3.connect(db_path)
+    try:
+        cur = conn.execute(query)
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                break
+            for row in rows:
+                yield user_dict(row)
+    finally:
+        conn.close()
+
+
+class UserColumns:
+    """The users table as compact columns, read chunk by chunk.
+
+    Only rowid, the codes of the `coded` columns (with their vocabularies, in `codes` and
+    `vocabularies`) and the `values` columns ({name: dtype}, in `values`) are held in
+    memory; role must be among the coded columns. Indexing builds the user dict from its
+    row of `query` with `user_dict` on demand and hands back the same dict when a user is
+    drawn again, so per-user state survives repeated draws. Supports len() and indexing,
+    as pick_victim needs.
+    """
+
+    def __init__(self, db_path, query, user_dict, coded=("role",), values=None, chunk_size=CHUNK_SIZE):
+        values = values or {}
+        self.conn = sqlite3.connect(db_path)
+        self.query = query
+        self.user_dict = user_dict
+        names = list(coded) + list(values)
+        vocabularies = {name: {} for name in coded}
+        chunks = []
+        cur = self.conn.execute(f"SELECT rowid, {', '.join(names)} FROM users")
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                break
+            rowid, *columns = zip(*rows)
+            chunk = [np.array(rowid, dtype=np.int64)]
+            for name, column in zip(names, columns):
+                if name in vocabularies:
+                    vocabulary = vocabularies[name]
+                    chunk.append(np.array([vocabulary.setdefault(v, len(vocabulary)) for v in column], dtype=np.int16))
+                else:
+                    chunk.append(np.array(column, dtype=values[name]))
+            chunks.append(chunk)
+        if chunks:
+            parts = [np.concatenate(part) for part in zip(*chunks)]
+        else:
+            parts = [np.empty(0, dtype) for dtype in [np.int64] + [np.int16] * len(coded) + list(values.values())]
+        self.rowid = parts[0]
+        self.codes = dict(zip(coded, parts[1:1 + len(coded)]))
+        self.vocabularies = {name: list(vocabulary) for name, vocabulary in vocabularies.items()}
+        self.values = dict(zip(values, parts[1 + len(coded):]))
+        self._users = {}
+
+    @property
+    def role_codes(self):
+        return self.codes["role"]
+
+    @property
+    def roles(self):
+        return self.vocabularies["role"]
+
+    def __len__(self):
+        return len(self.rowid)
+
+    def __getitem__(self, index):
+        rowid = int(self.rowid[index])
+        if rowid not in self._users:
+            row = self.conn.execute(self.query + " WHERE rowid = ?", (rowid,)).fetchone()
+            self._users[rowid] = self.user_dict(row)
+        return self._users[rowid]
+
+
+class RowidSampler:
+    """Uniform victim sampling by random rowid, without reading the table.
+
+    Startup is a single MIN/MAX(rowid) query; each draw looks up one row of `query` and
+    retries on rowid gaps (left behind by deletes or INSERT OR REPLACE re-seeding), which
+    keeps draws uniform over existing users.
+    """
+
+    def __init__(self, db_path, query, user_dict, rng=None):
+        self.rng = np.random.default_rng(rng)
+        self.conn = sqlite3.connect(db_path)
+        self.query = query
+        self.user_dict = user_dict
+        self.low, self.high = self.conn.execute("SELECT MIN(rowid), MAX(rowid) FROM users").fetchone()
+        if self.low is None:
+            raise ValueError(f"No users in {db_path}")
+        self._users = {}
+
+    def choice(self):
+        while True:
+            rowid = int(self.rng.integers(self.low, self.high + 1))
+            if rowid in self._users:
+                return self._users[rowid]
+            row = self.conn.execute(self.query + " WHERE rowid = ?", (rowid,)).fetchone()
+            if row is not None:
+                self._users[rowid] = self.user_dict(row)
+                return self._users[rowid]
+
+
+def reservoir_sample(k, users, rng=None):
+    """k of the streamed `users` drawn uniformly without replacement in one pass (Algorithm R)."""
+    rng = np.random.default_rng(rng)
+    sample = []
+    for i, user in enumerate(users):
+        if i < k:
+            sample.append(user)
+        else:
+            j = rng.integers(i + 1)
+            if j < k:
+                sample[j] = user
+    return sample
+
+
+def pick_victim(users, rng):
+    """One victim drawn uniformly with replacement from a list, UserColumns or RowidSampler.
+
+    A RowidSampler draws from its own generator; other tables draw from rng.
+    """
+    if isinstance(users, RowidSampler):
+        return users.choice()
+    return users[int(rng.integers(len(users)))]
+
+
+def role_codes(users):
+    """(codes, roles) for a UserColumns table or a list of user dicts."""
+    if isinstance(users, UserColumns):
+        return users.role_codes, users.roles
+    vocabulary = {}
+    codes = np.array([vocabulary.setdefault(u["role"], len(vocabulary)) for u in users], dtype=np.int16)
+    return codes, list(vocabulary)
+
+
+def campaign_role_stats(users, victims, compromised):
+    """Per-role {"attempts", "successes", "success_rate"} for a batched campaign."""
+    codes, roles = role_codes(users)
+    attempts = np.bincount(codes[victims], minlength=len(roles))
+    successes = np.bincount(codes[compromised], minlength=len(roles))
+    return {
+        role: {
+            "attempts": int(attempts[i]),
+            "successes": int(successes[i]),
+            "success_rate": float(successes[i] / attempts[i]) if attempts[i] else 0.0,
+        }
+        for i, role in enumerate(roles)
+    }
+
+
+def apportion(weights, population):
+    """Split population across keys in proportion to weights (largest remainder, exact total)."""
+    names = list(weights)
+    shares = np.array([weights[name] for name in names], dtype=float)
+    quotas = shares / shares.sum() * population
+    counts = np.floor(quotas).astype(int)
+    for i in np.argsort(counts - quotas)[:population - counts.sum()]:
+        counts[i] += 1
+    return dict(zip(names, counts.tolist()))
+
+
+def draw_weighted(rng, distribution, size):
+    """`size` keys of distribution ({value: weight}) drawn with replacement in proportion to their weights."""
+    values = list(distribution)
+    weights = np.array([distribution[v] for v in values], dtype=float)
+    return np.array(values)[rng.choice(len(values), size=size, p=weights / weights.sum())].tolist()